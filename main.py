@@ -1,27 +1,37 @@
 from tools.browser_tools import BrowserTools
 import asyncio
-import os, getpass
-from dotenv import load_dotenv
-from pydantic import SecretStr
+import hashlib
+import os
+import sys
+from uuid import uuid4
 from utils.utils import (
     load_llm_env_vars,
+    get_chat_llm,
     State,
+    ParallelToolNode,
     export_graph,
-    stream_until_done,
     pretty_print_messages,
 )
-from langchain_core.rate_limiters import InMemoryRateLimiter
-from langchain_openai import ChatOpenAI
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_community.agent_toolkits import PlayWrightBrowserToolkit
-from langchain_community.tools.playwright.utils import create_async_playwright_browser
-from langgraph.prebuilt import create_react_agent
+from langchain_core.messages import (
+    AIMessage,
+    HumanMessage,
+    SystemMessage,
+    trim_messages,
+)
 from langgraph.checkpoint.memory import MemorySaver
-from langgraph.prebuilt import ToolNode, tools_condition
-from langchain_core.messages import AIMessage
+
+try:
+    # The graph is driven through astream, and the sync SqliteSaver raises
+    # NotImplementedError from its async interface — only the aiosqlite
+    # saver can back this REPL.
+    from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+except ImportError:  # langgraph-checkpoint-sqlite (or aiosqlite) not installed
+    AsyncSqliteSaver = None
+from langgraph.prebuilt import tools_condition
 from langgraph.graph import StateGraph, START
 from langchain_core.runnables.config import RunnableConfig
 from langchain_core.runnables.graph import Graph
+from langchain_core.utils.function_calling import convert_to_openai_tool
 
 
 api_key, base_url, DEBUG = load_llm_env_vars()
@@ -30,74 +40,119 @@ api_key, base_url, DEBUG = load_llm_env_vars()
 username = os.getenv("USER_NAME") or exit("USERNAME not set in environment.")
 password = os.getenv("PASSWORD") or exit("PASSWORD not set in environment.")
 
-# 🎛️ Rate limiter: 1 request per minute
-rate_limiter = InMemoryRateLimiter(
-    requests_per_second=1 / 15,  # ~0.0167 requests/second
-    check_every_n_seconds=1,  # wake every second to refill
-    max_bucket_size=1,  # max burst = 1
+# Shared client: deterministic tool planning (temperature 0) with decode
+# capped at 256 tokens; see utils.get_chat_llm for the cached singleton.
+llm = get_chat_llm()
+
+# Static system block, built once at import so the rendered prefix is
+# byte-identical on every turn and the provider can serve it from its
+# prompt (KV-prefix) cache. Kept short: the tool catalog is already sent
+# as structured JSON schemas by llm.bind_tools(tools), so repeating it in
+# prose only doubles input tokens per turn. Credentials live in a separate
+# block below so they never destabilise this prefix.
+SYSTEM_PROMPT = (
+    "You are a leave-request assistant for https://erp.asigi.net/hr/admin. "
+    "Log in with the credentials provided separately, locate the leave "
+    "request section and submit the leave described by the user. Use the "
+    "provided tools for navigation, form filling and content extraction. "
+    "Respond with a single tool call and at most 15 words of reasoning; "
+    "never restate the plan. Tool confirmations use a compact "
+    "'ok|action|target' / 'err|action|reason' format."
 )
 
-llm = ChatOpenAI(
-    model="openai/gpt-4.1-nano",
-    api_key=SecretStr(api_key),
-    base_url=base_url,
-    default_headers={
-        "HTTP-Referer": "https://your-app.example",
-        "X-Title": "Vacation-robot",
-    },
-    temperature=0.7,
-    streaming=True,
-    rate_limiter=rate_limiter,  # <-- add limiter here
+# Fixed ids let `add_messages` replace (not duplicate) these blocks when the
+# prompt is resent on later turns; `cache_control` marks them as a cacheable
+# prefix for Anthropic-style providers behind OpenRouter.
+system_message = SystemMessage(
+    content=SYSTEM_PROMPT,
+    additional_kwargs={"cache_control": {"type": "ephemeral"}},
+    id="system-static",
 )
-prompt_template = ChatPromptTemplate.from_messages(
-    [
-        (
-            "system",
-            """
-            You are an advanced leave requesting assistant designed to help clerks on the 'https://erp.asigi.net/hr/admin' portal. Your task is to log into the portal using the provided credentials, navigate the site, and efficiently submit leave requests. 
-
-            To get started, navigate to 'https://erp.asigi.net/hr/admin' and log in using the username '{username}' and password '{password}'. After logging in, you should locate the leave request submission section and submit the leave. Throughout the process, you should leverage the available tools to assist with navigation, form filling, and content extraction.
-
-            Tools available for your use:
-            
-            **Browser Tools**:
-            - **Navigate to URL**: Use this to visit the portal or any webpage. Make sure to wait for the page to load before interacting with elements.
-            - **Click Element**: Click on elements using CSS selectors. You can click buttons, links, or other interactive elements. Ensure that you click the correct element to proceed.
-            - **Input Text**: Enter text into form fields by locating them via CSS selectors. This is essential for filling out the leave request form.
-            - **Safe Click Element**: A more reliable version of the Click Element tool that waits for the element to become clickable before attempting to click it.
-            - **Safe Input Text**: A more reliable version of the Input Text tool that waits for the element to be interactable before inputting text.
-            - **Scroll**: Scroll the page vertically by a set number of pixels. Use this to view content that's not visible without scrolling.
-            - **Wait for Element**: Wait for an element to appear on the page before proceeding with the next action. This ensures you interact with the right elements after page loads or dynamic changes.
-            - **Get Page Content**: Retrieve all visible text from the current page. Useful for verifying information or confirming if the page has loaded as expected.
-            - **Take Screenshot**: Capture a screenshot of the current page, which can be helpful for debugging or reporting.
-            - **Press Key**: Simulate keyboard presses (like ENTER, TAB, ESC) to interact with form fields and buttons.
-            - **Check Element Exists**: Verify if an element exists on the page, including its visibility and interactability. This helps avoid errors when interacting with elements.
-            - **Find Elements by Text**: Search for elements that contain specific text. This can help locate form fields, buttons, or any text-based element.
-            - **Get Page Info**: Collect detailed information about the page, including the number of elements like buttons, links, forms, and images. This is useful for understanding the page structure.
-            - **Get Clickable Elements**: Discover all clickable elements on the page with details like their text, selector, and type. This helps identify which elements can be interacted with.
-            - **Get Form Elements**: Retrieve all form elements on the page (inputs, buttons, textareas) with details about their names, IDs, and other attributes. This is helpful for identifying the fields you need to fill out for leave requests.
-            - **Refresh Page**: Refresh the current page if needed, and wait for the page to reload.
-            - **Go Back**: Navigate back to the previous page if needed.
-            - **Go Forward**: Navigate forward in browser history if applicable.
-
-            Your objective is to complete the leave request process by interacting with the site effectively, ensuring the leave request is submitted correctly. Be sure to use all tools at your disposal to perform these tasks with accuracy and efficiency.
-            """,
-        ),
-        ("user", "{text}"),
-    ]
+credentials_message = SystemMessage(
+    content=f"Portal credentials: username '{username}', password '{password}'.",
+    additional_kwargs={"cache_control": {"type": "ephemeral"}},
+    id="system-credentials",
 )
-browser_tools = BrowserTools(headless=False)
+# One long-lived browser (and Chrome profile) for the whole conversation:
+# startup cost is paid once and a persisted login session survives restarts.
+browser_tools = BrowserTools(headless=False, user_data_dir=".chrome-profile")
+
+# Speculatively load the login page while the model decodes its first tool
+# call; navigate_to_url joins this load instead of reissuing it. Only the
+# known-safe portal URL is prefetched.
+PORTAL_URL = "https://erp.asigi.net/hr/admin"
+browser_tools.prefetch(PORTAL_URL)
 tools = browser_tools.get_tools()
 
-tool_node = ToolNode(tools=tools)
+tool_node = ParallelToolNode(tools=tools)
+
+# strict=True asks the provider for schema-constrained decoding of tool
+# arguments: no malformed-JSON retries and no tokens wasted outside the
+# declared args_schema. Strict mode demands that every property be listed
+# in `required`, so it only fits tools whose parameters have no defaults;
+# the rest (scroll, wait_for_element, the batch tools, ...) are bound with
+# their plain schemas.
+
+
+def _openai_tool_spec(tool) -> dict:
+    spec = convert_to_openai_tool(tool)
+    params = spec["function"].get("parameters", {})
+    if set(params.get("required", [])) == set(params.get("properties", {})):
+        return convert_to_openai_tool(tool, strict=True)
+    return spec
+
+
+llm_with_tools = llm.bind_tools([_openai_tool_spec(t) for t in tools])
+
+
+# Exact-match response cache: repeated clerk queries ("submit daily leave
+# for 15 khordad") skip the network entirely instead of paying a full model
+# call. Keyed by the latest user turn; answers that plan tool calls are not
+# cached since their tool_call_ids must stay unique per run.
+response_cache: dict = {}
+
 
-llm_with_tools = llm.bind_tools(tools)
+def _cache_key(message) -> str | None:
+    if isinstance(message, HumanMessage) and isinstance(message.content, str):
+        return hashlib.sha256(message.content.encode("utf-8")).hexdigest()
+    return None
+
+
+# Tool observations (page dumps, element lists) accumulate in the state and
+# are re-sent on every turn, so input tokens grow superlinearly. Bound what
+# each call sees: keep the system blocks plus the most recent turns that fit.
+HISTORY_TOKEN_BUDGET = 4000
+
+
+def _trim_history(messages: list) -> list:
+    # include_system=True only protects the SystemMessage at index 0, but
+    # the credentials live in a second fixed-id system block — trim just
+    # the conversational tail and re-prepend every system message so the
+    # agent can still log in after the budget is exceeded.
+    system = [m for m in messages if isinstance(m, SystemMessage)]
+    rest = [m for m in messages if not isinstance(m, SystemMessage)]
+    return system + trim_messages(
+        rest,
+        max_tokens=HISTORY_TOKEN_BUDGET,
+        token_counter=llm,
+        strategy="last",
+        start_on="human",  # never split an AIMessage from its ToolMessages
+    )
 
 
 def chatbot(state: State):
-    message = llm_with_tools.invoke(state["messages"])
+    key = _cache_key(state["messages"][-1])
+    if key is not None and key in response_cache:
+        # Re-issue under a fresh id: the reducer replaces by id, so handing
+        # back the stored object would overwrite the historical reply at
+        # its old position instead of answering the new human turn.
+        cached = response_cache[key].model_copy(update={"id": str(uuid4())})
+        return {"messages": [cached]}
+    message = llm_with_tools.invoke(_trim_history(state["messages"]))
     # if isinstance(message, AIMessage):
     #     assert len(message.tool_calls) <= 1
+    if key is not None and isinstance(message, AIMessage) and not message.tool_calls:
+        response_cache[key] = message
     return {"messages": [message]}
 
 
@@ -117,30 +172,49 @@ graph_builder.add_conditional_edges(
 thread_id = "main_conversation"
 config = RunnableConfig(configurable={"thread_id": thread_id})
 
-if MemorySaver:
-    checkpointer = MemorySaver()
-    graph = graph_builder.compile(checkpointer=checkpointer)
-    print("✅ Graph compiled with checkpointer")
-else:
-    graph = graph_builder.compile()
-    print("⚠️  Graph compiled without checkpointer - state access limited")
-
-g: Graph = graph.get_graph()
-
-
-export_graph(g)
+async def repl(graph) -> None:
+    """Async REPL: one event loop drives browser I/O, LLM streaming and
+    user input, so tool waits overlap with the user typing the next turn."""
+    # Graph export is a dev aid; skip it (and its Mermaid network call)
+    # unless explicitly requested.
+    if os.getenv("EXPORT_GRAPH"):
+        g: Graph = graph.get_graph()
+        export_graph(g)
+    while True:
+        user_input = await asyncio.to_thread(input, "Enter your message: ")
+        if user_input.lower() in ["exit", "quit", "bye"]:
+            break
+        prompt = [system_message, credentials_message, HumanMessage(content=user_input)]
+        # "updates" streams only each node's new messages; "values" would
+        # re-serialize the whole accumulated history after every step.
+        async for step in graph.astream(
+            {"messages": prompt}, config, stream_mode="updates"
+        ):
+            for node, delta in step.items():
+                if DEBUG:
+                    print(f"DEBUG [{node}]:", delta)
+                if delta:
+                    pretty_print_messages(delta, DEBUG=DEBUG)
+        # One flush per turn instead of one per streamed event.
+        sys.stdout.flush()
+
+
+async def main() -> None:
+    # A persistent checkpointer lets thread_id="main_conversation" truly
+    # resume after a restart, so the model never re-sees (and we never
+    # re-prefill) a conversation the previous process already ran. The
+    # async saver must be entered on the running event loop, so the graph
+    # is compiled here rather than at import time.
+    if AsyncSqliteSaver:
+        async with AsyncSqliteSaver.from_conn_string("state.sqlite") as checkpointer:
+            print("✅ Graph compiled with persistent SQLite checkpointer")
+            await repl(graph_builder.compile(checkpointer=checkpointer))
+    elif MemorySaver:
+        print("✅ Graph compiled with checkpointer")
+        await repl(graph_builder.compile(checkpointer=MemorySaver()))
+    else:
+        print("⚠️  Graph compiled without checkpointer - state access limited")
+        await repl(graph_builder.compile())
 
-pending_interrupt = False
 
-while True:
-    snapshot = graph.get_state(config)
-    user_input = input("Enter your message: ")
-    prompt = prompt_template.invoke(
-        {"username": username, "password": password, "text": user_input}
-    ).to_messages()
-    if user_input.lower() in ["exit", "quit", "bye"]:
-        break
-    else:
-        for event in stream_until_done(graph, {"messages": prompt}, config, DEBUG=DEBUG):
-            # print(event["messages"][-1].content)
-            pretty_print_messages(event, DEBUG=DEBUG)
+asyncio.run(main())
@@ -1,21 +1,13 @@
-import getpass
 from langgraph.prebuilt import create_react_agent
-import os
-from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
-from pydantic import SecretStr
 
-load_dotenv()
+import sys
+from pathlib import Path
 
-if not os.getenv("LLM_API_TOKEN"):
-    os.environ["LLM_API_KEY"] = getpass.getpass("Enter your Anthropic API key: ")
+sys.path.append(str(Path(__file__).resolve().parent.parent))
 
+from utils.utils import get_chat_llm
 
-llm = ChatOpenAI(
-    model="openai/gpt-4.1-nano",
-    api_key=SecretStr(os.getenv("LLM_API_TOKEN") or ""),
-    base_url=os.getenv("LLM_BASE_URL"),
-)
+llm = get_chat_llm()
 
 
 def get_weather(city: str) -> str:
@@ -20,7 +20,7 @@ from utils.utils import (
     stream_graph_updates,
     BasicToolNode,
     State,
-    route_tools,
+    make_route_tools,
 )
 
 
@@ -59,7 +59,7 @@ graph_builder.add_edge(START, "chatbot")
 
 graph_builder.add_conditional_edges(
     "chatbot",
-    route_tools,
+    make_route_tools(),
     # The following dictionary lets you tell the graph to interpret the condition's outputs as a specific node
     # It defaults to the identity function, but if you
     # want to use a node named something else apart from "tools",
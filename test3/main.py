@@ -11,7 +11,7 @@ from langchain_tavily import TavilySearch
 from langgraph.types import Command, interrupt
 from langchain_core.tools import tool
 from langgraph.prebuilt import ToolNode, tools_condition
-from utils.utils import export_graph, State
+from utils.utils import export_graph, State, ParallelToolNode
 from langchain_core.messages import HumanMessage, AIMessage
 
 
@@ -55,7 +55,7 @@ def chatbot(state: State):
     return {"messages": [message]}
 
 
-tool_node = ToolNode(tools=tools)
+tool_node = ParallelToolNode(tools=tools)
 graph_builder.add_node("tools", tool_node)
 graph_builder.add_node("chatbot", chatbot)
 
@@ -1,25 +1,493 @@
-from typing import List, Optional, Dict, Any
-import time
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, List, Optional, Dict, Any
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import asyncio
+import base64
+import functools
+import os
+import re
+import threading
 import json
 
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import NoSuchElementException, TimeoutException, ElementNotInteractableException
-from langchain.tools import StructuredTool
+if TYPE_CHECKING:
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from langchain.tools import StructuredTool
+
+# Selenium (and transitively urllib3 et al.) takes a noticeable fraction of
+# interpreter startup; scripts that import this module only for its types or
+# for get_tools() signatures shouldn't pay it. The real import happens once,
+# on first browser construction, and populates the module globals the
+# methods reference.
+_SELENIUM_LOADED = False
+
+
+def _ensure_selenium() -> None:
+    global _SELENIUM_LOADED, webdriver, By, Keys, Options, WebDriverWait, EC
+    global NoSuchElementException, StaleElementReferenceException
+    global TimeoutException, ElementNotInteractableException
+    global ElementClickInterceptedException
+    if _SELENIUM_LOADED:
+        return
+    from selenium import webdriver
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.common.keys import Keys
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.common.exceptions import (
+        NoSuchElementException,
+        StaleElementReferenceException,
+        TimeoutException,
+        ElementNotInteractableException,
+        ElementClickInterceptedException,
+    )
+
+    BrowserTools._KEY_MAP = {
+        "ENTER": Keys.ENTER,
+        "TAB": Keys.TAB,
+        "ESC": Keys.ESCAPE,
+        "ESCAPE": Keys.ESCAPE,
+        "SPACE": Keys.SPACE,
+        "BACKSPACE": Keys.BACKSPACE,
+    }
+    BrowserTools._KEY_LIST = ", ".join(BrowserTools._KEY_MAP)
+    _SELENIUM_LOADED = True
+
+
+# Plain #id / .class selectors can skip the generic CSS engine in favour of
+# the browser's native (indexed) lookups.
+_ID_RE = re.compile(r"^#([A-Za-z_][\w-]*)$")
+_CLASS_RE = re.compile(r"^\.([A-Za-z_][\w-]*)$")
+
+
+@lru_cache(maxsize=1024)
+def _classify_selector(selector: str) -> tuple:
+    """Classify ``selector`` once into (kind, key) with kind in id/class/css.
+
+    Agents hit the same handful of selectors over and over; caching the
+    classification drops the per-call regex work from every lookup.
+    """
+    m = _ID_RE.match(selector)
+    if m:
+        return ("id", m.group(1))
+    m = _CLASS_RE.match(selector)
+    if m:
+        return ("class", m.group(1))
+    return ("css", selector)
+
+
+@lru_cache(maxsize=256)
+def _css_locator(selector: str) -> tuple:
+    """Memoized ``(By.CSS_SELECTOR, selector)`` locator for repeated lookups.
+
+    Agents wait on the same selectors across many steps; reusing the tuple
+    avoids a fresh allocation per call (and keeps one interned selector
+    string alive instead of duplicates).
+    """
+    _ensure_selenium()
+    return (By.CSS_SELECTOR, selector)
+
+
+@lru_cache(maxsize=4)
+def _make_options(
+    headless: bool, user_data_dir: Optional[str], load_images: bool = True
+) -> Options:
+    """Build (and memoize) the Chrome Options for a launch configuration.
+
+    Options construction walks the argument list on every add_argument call;
+    caching by (headless, user_data_dir, load_images) makes repeated
+    BrowserTools construction — e.g. across scripts in one process — reuse
+    the object.
+    """
+    _ensure_selenium()
+    options = Options()
+    if headless:
+        # Chrome 109+ supports --headless=new which is more stable.
+        options.add_argument("--headless=new")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    # Trim background work irrelevant to a scripted session: no translate
+    # UI, media-router discovery, optimization-hints fetches, periodic
+    # background requests or profile sync competing for network/CPU.
+    options.add_argument("--disable-features=Translate,MediaRouter,OptimizationHints")
+    options.add_argument("--disable-background-networking")
+    options.add_argument("--disable-sync")
+    if not load_images:
+        # Text-driven agents never look at images unless screenshotting;
+        # skipping them cuts most of the page weight on image-heavy ERPs.
+        options.add_argument("--blink-settings=imagesEnabled=false")
+    # Return from driver.get() on DOMContentLoaded instead of the full load
+    # event — tools that need late content already wait via wait_for_element.
+    options.page_load_strategy = "eager"
+    if user_data_dir:
+        options.add_argument(f"--user-data-dir={os.path.abspath(user_data_dir)}")
+    return options
+
+# Small single-purpose snippets, hoisted so each execute_script call ships
+# an interned constant instead of rebuilding (and re-parsing) the source.
+_JS_GET_BY_ID = "return document.getElementById(arguments[0]);"
+_JS_GET_BY_CLASS = "return document.getElementsByClassName(arguments[0])[0];"
+_JS_SCROLL_BY = "window.scrollBy(0, arguments[0]);"
+_JS_OPEN_TAB = "window.open('');"
+_JS_BODY_TEXT = "return document.body.innerText"
+_JS_READY_STATE = "return document.readyState"
+_JS_ELEMENT_TEXT = (
+    "const el = document.querySelector(arguments[0]);"
+    " return el ? el.innerText : null;"
+)
+# All the fields check_element_exists reports, gathered in one hop.
+_JS_ELEMENT_INFO = """
+const el = document.querySelector(arguments[0]);
+if (!el) return null;
+return {
+    visible: el.offsetParent !== null,
+    enabled: !el.disabled,
+    tag_name: el.tagName.toLowerCase(),
+    type: el.getAttribute("type") || "unknown",
+    text: (el.innerText || "").slice(0, 100)
+};
+"""
+# Cheap DOM fingerprint: URL, node count and text length shift on any
+# meaningful page change, and computing it costs one small round-trip
+# versus re-running a full scan.
+_JS_FINGERPRINT = (
+    "return location.href + '|' + document.getElementsByTagName('*').length"
+    " + '|' + (document.body ? document.body.innerText.length : 0);"
+)
+
+# Set an input's value through the prototype's native setter and fire the
+# framework events. One execute_script replaces the clear + per-character
+# send_keys exchange, and the native setter keeps React/Vue value tracking
+# in sync (a plain `el.value =` is ignored by controlled components).
+_JS_SET_VALUE = """
+const el = document.querySelector(arguments[0]);
+if (!el) return "err|input|" + arguments[0] + "|not found";
+const proto = el.tagName === "TEXTAREA"
+    ? window.HTMLTextAreaElement.prototype
+    : window.HTMLInputElement.prototype;
+const desc = Object.getOwnPropertyDescriptor(proto, "value");
+if (desc && desc.set) { desc.set.call(el, arguments[1]); }
+else { el.value = arguments[1]; }
+el.dispatchEvent(new Event("input", {bubbles: true}));
+el.dispatchEvent(new Event("change", {bubbles: true}));
+return "ok|input|" + arguments[0];
+"""
+
+# Page summary in one round-trip: title, URL and element-type counts come
+# back as a single object instead of one find_elements call per type.
+_JS_PAGE_INFO = """
+return {
+    title: document.title,
+    url: location.href,
+    elements: {
+        buttons: document.querySelectorAll(
+            "button, input[type='button'], input[type='submit'], input[type='reset']"
+        ).length,
+        links: document.getElementsByTagName("a").length,
+        inputs: document.querySelectorAll("input, textarea, select").length,
+        forms: document.getElementsByTagName("form").length,
+        images: document.getElementsByTagName("img").length,
+        tables: document.getElementsByTagName("table").length
+    }
+};
+"""
+
+# Helper bundle installed on every new document via CDP so selector
+# generation always runs in-page; _JS_SELECTOR_FN below stays as the inline
+# fallback for non-Chromium drivers.
+_JS_BOOT_HELPERS = """
+window.__bt = window.__bt || {};
+if (!window.__bt.selector) {
+    // WeakMap memo: repeated scans touch the same nodes, and entries vanish
+    // with the nodes themselves, so the cache can't leak or go stale.
+    const memo = new WeakMap();
+    window.__bt.selector = function (el) {
+        let sel = memo.get(el);
+        if (sel !== undefined) return sel;
+        if (el.id) sel = "#" + CSS.escape(el.id);
+        else if (el.classList.length) sel = "." + CSS.escape(el.classList[0]);
+        else {
+            const tag = el.tagName.toLowerCase();
+            sel = el.parentElement
+                ? tag + ":nth-child(" + (Array.prototype.indexOf.call(el.parentElement.children, el) + 1) + ")"
+                : tag;
+        }
+        memo.set(el, sel);
+        return sel;
+    };
+}
+"""
+
+# Shared in-page selector builder: id, else first class, else tag:nth-child.
+# Delegates to the memoized boot helper when installed.
+_JS_SELECTOR_FN = """
+function cssFor(el) {
+    if (window.__bt && window.__bt.selector) return window.__bt.selector(el);
+    if (el.id) return "#" + CSS.escape(el.id);
+    if (el.classList.length) return "." + CSS.escape(el.classList[0]);
+    const tag = el.tagName.toLowerCase();
+    if (!el.parentElement) return tag;
+    return tag + ":nth-child(" + (Array.prototype.indexOf.call(el.parentElement.children, el) + 1) + ")";
+}
+"""
+
+# Element scanners run entirely in-page: visibility comes from offsetParent
+# (no per-element is_displayed round-trips), duplicates are dropped with a
+# Set, and only the slim result array crosses the wire.
+_JS_CLICKABLE = _JS_SELECTOR_FN + """
+const limit = arguments[0];
+const seen = new Set();
+const out = [];
+const nodes = document.querySelectorAll(
+    "button, input[type='button'], input[type='submit'], input[type='reset'], a[href], [onclick], [role='button']"
+);
+for (const el of nodes) {
+    if (el.offsetParent === null || el.disabled) continue;
+    const sel = cssFor(el);
+    if (seen.has(sel)) continue;
+    seen.add(sel);
+    out.push({
+        selector: sel,
+        text: (el.innerText || el.value || "").trim().slice(0, 50),
+        type: el.getAttribute("type") || el.tagName.toLowerCase()
+    });
+    if (out.length >= limit) break;
+}
+return out;
+"""
+
+# Selector for a single held WebElement; prefers the installed helper.
+_JS_ELEMENT_SELECTOR = _JS_SELECTOR_FN + """
+const el = arguments[0];
+return (window.__bt && window.__bt.selector) ? window.__bt.selector(el) : cssFor(el);
+"""
+
+_JS_FORM_ELEMENTS = _JS_SELECTOR_FN + """
+const out = [];
+const nodes = document.querySelectorAll("input, textarea, select, button[type='submit']");
+for (const el of nodes) {
+    if (el.offsetParent === null) continue;
+    out.push({
+        tag_name: el.tagName.toLowerCase(),
+        type: el.getAttribute("type") || "unknown",
+        name: el.name || "",
+        id: el.id || "",
+        placeholder: el.getAttribute("placeholder") || "",
+        value: el.value || "",
+        selector: cssFor(el),
+        required: el.required === true
+    });
+}
+return out;
+"""
+
+# Text search over a TreeWalker: the needle travels as a script argument
+# (no XPath string interpolation, so quotes in user text can't break — or
+# inject into — the query) and only the top matches cross the wire.
+_JS_FIND_BY_TEXT = _JS_SELECTOR_FN + """
+const needle = arguments[0], partial = arguments[1], limit = arguments[2];
+const walker = document.createTreeWalker(document.body, NodeFilter.SHOW_TEXT);
+const seen = new Set();
+const results = [];
+let count = 0;
+let node;
+while ((node = walker.nextNode())) {
+    const t = node.textContent;
+    if (!(partial ? t.includes(needle) : t.trim() === needle)) continue;
+    const el = node.parentElement;
+    if (!el || seen.has(el)) continue;
+    seen.add(el);
+    count++;
+    if (results.length < limit) {
+        results.push({
+            index: results.length,
+            tag_name: el.tagName.toLowerCase(),
+            text: (el.innerText || "").slice(0, 100),
+            selector: cssFor(el),
+            visible: el.offsetParent !== null,
+            enabled: !el.disabled
+        });
+    }
+}
+return {count: count, results: results};
+"""
+
+# In-page dispatcher for batch_actions: one execute_script round-trip runs
+# the whole action list instead of one WebDriver HTTP hop per operation.
+_JS_BATCH = """
+const actions = arguments[0];
+const out = [];
+for (const a of actions) {
+    const el = document.querySelector(a.selector);
+    if (!el) { out.push("err|" + a.op + "|" + a.selector + "|not found"); continue; }
+    try {
+        if (a.op === "click") {
+            el.click();
+            out.push("ok|click|" + a.selector);
+        } else if (a.op === "input") {
+            el.focus();
+            el.value = a.arg;
+            el.dispatchEvent(new Event("input", {bubbles: true}));
+            el.dispatchEvent(new Event("change", {bubbles: true}));
+            out.push("ok|input|" + a.selector);
+        } else if (a.op === "text") {
+            out.push(el.innerText);
+        } else if (a.op === "key") {
+            el.dispatchEvent(new KeyboardEvent("keydown", {key: a.arg, bubbles: true}));
+            el.dispatchEvent(new KeyboardEvent("keyup", {key: a.arg, bubbles: true}));
+            out.push("ok|key|" + a.arg + "|" + a.selector);
+        } else {
+            out.push("err|" + a.op + "|" + a.selector + "|unsupported op");
+        }
+    } catch (e) {
+        out.push("err|" + a.op + "|" + a.selector + "|" + e.message);
+    }
+}
+return out;
+"""
+
+
+# Wait for a selector via MutationObserver and act on it inside the page:
+# one execute_async_script round-trip replaces a WebDriverWait polling loop
+# (an HTTP request per poll) plus a separate action call.
+_JS_WAIT_AND_ACT = """
+const sel = arguments[0], op = arguments[1], arg = arguments[2], timeoutMs = arguments[3];
+const done = arguments[arguments.length - 1];
+function act(el) {
+    try {
+        if (op === "click") {
+            el.click();
+            done("ok|click|" + sel);
+        } else if (op === "input") {
+            el.focus();
+            el.value = arg;
+            el.dispatchEvent(new Event("input", {bubbles: true}));
+            el.dispatchEvent(new Event("change", {bubbles: true}));
+            done("ok|input|" + sel);
+        } else if (op === "text") {
+            done(el.innerText);
+        } else {
+            done("err|" + op + "|" + sel + "|unsupported op");
+        }
+    } catch (e) { done("err|" + op + "|" + sel + "|" + e.message); }
+}
+const existing = document.querySelector(sel);
+if (existing) { act(existing); return; }
+const timer = setTimeout(() => { mo.disconnect(); done("err|" + op + "|" + sel + "|timeout"); }, timeoutMs);
+const mo = new MutationObserver(() => {
+    const el = document.querySelector(sel);
+    if (el) { mo.disconnect(); clearTimeout(timer); act(el); }
+});
+mo.observe(document.documentElement, {childList: true, subtree: true, attributes: true});
+"""
+
+
+# Read (or click) many selectors in one execute_script hop; per-selector
+# errors become err| strings instead of aborting the batch.
+_JS_GET_TEXTS = """
+return arguments[0].map(sel => {
+    const el = document.querySelector(sel);
+    return el ? el.innerText : "err|text|" + sel + "|not found";
+});
+"""
+
+_JS_CLICK_ALL = """
+return arguments[0].map(sel => {
+    const el = document.querySelector(sel);
+    if (!el) return "err|click|" + sel + "|not found";
+    try { el.click(); return "ok|click|" + sel; }
+    catch (e) { return "err|click|" + sel + "|" + e.message; }
+});
+"""
+
+
+# Page-load wait in one round-trip: the in-page loop resolves as soon as
+# the document is complete and in-flight jQuery work (the only async signal
+# classic ERP frontends expose) has drained — no fixed sleep, no HTTP polls.
+_JS_WAIT_LOAD = """
+const timeoutMs = arguments[0];
+const done = arguments[arguments.length - 1];
+const deadline = Date.now() + timeoutMs;
+function quiescent() {
+    return !(window.jQuery && window.jQuery.active > 0);
+}
+function check() {
+    if (document.readyState === "complete" && quiescent()) { done(true); return; }
+    if (Date.now() > deadline) { done(false); return; }
+    setTimeout(check, 50);
+}
+check();
+"""
+
+# Presence wait without polling: resolve the async-script callback the
+# instant the selector matches (or on timeout).
+_JS_WAIT_FOR = """
+const sel = arguments[0], timeoutMs = arguments[1];
+const done = arguments[arguments.length - 1];
+if (document.querySelector(sel)) { done(true); return; }
+const timer = setTimeout(() => { mo.disconnect(); done(false); }, timeoutMs);
+const mo = new MutationObserver(() => {
+    if (document.querySelector(sel)) { mo.disconnect(); clearTimeout(timer); done(true); }
+});
+mo.observe(document.documentElement, {childList: true, subtree: true, attributes: true});
+"""
 
 
 class BrowserTools:
     """Collection of Selenium-powered browser utilities exposed as LangChain tools."""
 
+    # One long-lived instance, but its methods hit these attributes in tight
+    # loops; slot descriptors make each load a C-level index instead of a
+    # __dict__ hash probe (and catch typo'd attribute writes early).
+    __slots__ = (
+        "driver",
+        "_cdp_nav",
+        "_prefetch_url",
+        "_prefetch_thread",
+        "_handles",
+        "_el_cache",
+        "_dom_cache",
+        "_tools",
+        "_io_pool",
+        "_pending_writes",
+    )
+
+    # Cap on how much page text a single tool call feeds into the LLM context.
+    PAGE_CONTENT_CHUNK = 4096
+    # Cap on how many clickable elements are reported per scan.
+    MAX_CLICKABLE_ELEMENTS = 50
+    # Bound on the per-selector WebElement cache.
+    EL_CACHE_SIZE = 256
+
+    # Key names accepted by press_key; filled by _ensure_selenium once the
+    # Keys constants are importable.
+    _KEY_MAP: Dict[str, str] = {}
+    _KEY_LIST = ""
+
+    # Methods batch_read may fan out concurrently: read-only by construction,
+    # so interleaving them cannot change page state.
+    _READ_ONLY_METHODS = frozenset({
+        "get_page_content",
+        "get_element_text",
+        "get_texts",
+        "get_page_info",
+        "get_clickable_elements",
+        "get_form_elements",
+        "check_element_exists",
+        "find_elements_by_text",
+    })
+
     def __init__(
         self,
         driver: Optional[webdriver.Chrome] = None,
         headless: bool = False,
         page_load_timeout: int = 30,
+        user_data_dir: Optional[str] = None,
+        load_images: bool = True,
     ) -> None:
         """Create a BrowserTools instance.
 
@@ -28,146 +496,592 @@ class BrowserTools:
                 will be created automatically.
             headless: Whether to launch the browser in headless mode (default: True).
             page_load_timeout: Seconds to wait before a page-load is considered timed-out.
+            user_data_dir: Optional Chrome profile directory. Reusing one keeps
+                cookies/session storage between runs, so an already-authenticated
+                portal session skips the whole login tool sequence.
+            load_images: Set False to skip image downloads entirely; screenshots
+                will show placeholders but page loads get much lighter.
         """
+        _ensure_selenium()
         if driver:
             self.driver = driver
         else:
-            options = Options()
-            if headless:
-                # Chrome 109+ supports --headless=new which is more stable.
-                options.add_argument("--headless=new")
-            options.add_argument("--no-sandbox")
-            options.add_argument("--disable-dev-shm-usage")
-            self.driver = webdriver.Chrome(options=options)
+            self.driver = webdriver.Chrome(
+                options=_make_options(headless, user_data_dir, load_images)
+            )
 
         # Fail fast if a page takes too long to load
         self.driver.set_page_load_timeout(page_load_timeout)
+        # Let the server-side implicit wait cover element presence: the
+        # driver retries find_element internally instead of a Python-side
+        # ExpectedCondition loop with one HTTP request per 0.5 s poll.
+        self.driver.implicitly_wait(2)
+
+        # Every WebDriver command is a keep-alive HTTP call to chromedriver;
+        # the default urllib3 pool holds one connection, which serializes
+        # concurrent tool calls (parallel waits + actions). Chrome's
+        # constructor exposes no client_config hook, so resize the pool on
+        # the live command executor.
+        self._enlarge_command_pool()
+
+        # Enable the CDP Page domain once so _eval_js and _snapshot can use
+        # the devtools channel; non-Chromium drivers fall back to
+        # execute_script everywhere.
+        try:
+            self.driver.execute_cdp_cmd("Page.enable", {})
+            # Install the in-page helper bundle on every future document and
+            # on the current one, so selector generation never ships its
+            # source per call.
+            self.driver.execute_cdp_cmd(
+                "Page.addScriptToEvaluateOnNewDocument", {"source": _JS_BOOT_HELPERS}
+            )
+            self.driver.execute_cdp_cmd(
+                "Runtime.evaluate", {"expression": _JS_BOOT_HELPERS}
+            )
+            self._cdp_nav = True
+        except Exception:
+            self._cdp_nav = False
+
+        # Speculative navigation state (see ``prefetch``)
+        self._prefetch_url: Optional[str] = None
+        self._prefetch_thread: Optional[threading.Thread] = None
+
+        # Locally mirrored tab handles: driver.window_handles is an HTTP
+        # round-trip, but the handle list only changes through our own
+        # open/close/switch methods, so it can be kept client-side.
+        self._handles: List[str] = []
+
+        # LRU of selector -> WebElement; agents tend to act on the same few
+        # fields repeatedly, and a cache hit saves a find_element round-trip.
+        self._el_cache: "OrderedDict[str, Any]" = OrderedDict()
+        # Read-only scan results keyed by (scan, args), validated against a
+        # cheap DOM fingerprint; the model often re-requests the same page
+        # summary several turns in a row.
+        self._dom_cache: Dict[tuple, tuple] = {}
+
+        # Built lazily by get_tools() and reused thereafter.
+        self._tools: Optional[List[StructuredTool]] = None
+
+        # Background writer for screenshot/page-dump files, so tool calls
+        # return without waiting on disk I/O. Completions are drained by
+        # flush_writes()/close_browser.
+        self._io_pool = ThreadPoolExecutor(max_workers=2)
+        self._pending_writes: List[Any] = []
+
+    def _enlarge_command_pool(self, maxsize: int = 32) -> None:
+        """Swap the command executor's urllib3 pool for a larger one so
+        parallel tool calls reuse warm TCP connections instead of queueing
+        on a single-slot pool."""
+        try:
+            import urllib3
+
+            executor = self.driver.command_executor
+            if hasattr(executor, "_conn"):
+                executor._conn = urllib3.PoolManager(maxsize=maxsize, block=False)
+        except Exception:
+            # Executor internals differ across selenium versions; the default
+            # pool still works, just with more contention.
+            pass
+
+    # ---------------------------------------------------------------------
+    # Element resolution helpers
+    # ---------------------------------------------------------------------
+
+    def _find(self, selector: str):
+        """Look up ``selector``, fast-pathing plain #id / .class selectors to
+        getElementById / getElementsByClassName — O(1)/indexed in the browser
+        versus a full querySelector tree walk."""
+        kind, key = _classify_selector(selector)
+        if kind == "id":
+            element = self.driver.execute_script(_JS_GET_BY_ID, key)
+            if element is None:
+                raise NoSuchElementException(f"No element with id '{key}'")
+            return element
+        if kind == "class":
+            element = self.driver.execute_script(_JS_GET_BY_CLASS, key)
+            if element is None:
+                raise NoSuchElementException(f"No element with class '{key}'")
+            return element
+        return self.driver.find_element(*_css_locator(key))
+
+    def _resolve(self, selector: str, refresh: bool = False):
+        """Return the WebElement for ``selector``, via the per-page LRU cache."""
+        if not refresh:
+            element = self._el_cache.get(selector)
+            if element is not None:
+                self._el_cache.move_to_end(selector)
+                return element
+        element = self._find(selector)
+        self._el_cache[selector] = element
+        if len(self._el_cache) > self.EL_CACHE_SIZE:
+            self._el_cache.popitem(last=False)
+        return element
+
+    def _invalidate_elements(self) -> None:
+        """Drop cached element references after anything that replaces the DOM."""
+        self._el_cache.clear()
+        self._dom_cache.clear()
+
+    def _snapshot(self) -> Optional[Dict[str, Any]]:
+        """Fetch a flattened CDP DOM snapshot, cached by the DOM fingerprint.
+
+        One ``DOMSnapshot.captureSnapshot`` carries the whole tree (node
+        names, attributes, document metadata) in a single payload, so any
+        number of Python-side scans over it are free until the page
+        mutates. Returns None on non-Chromium drivers.
+        """
+        if not self._cdp_nav:
+            return None
+
+        def compute():
+            try:
+                return self.driver.execute_cdp_cmd(
+                    "DOMSnapshot.captureSnapshot", {"computedStyles": []}
+                )
+            except Exception:
+                return None
+
+        return self._cached_scan(("snapshot",), compute)
+
+    @staticmethod
+    def _page_info_from_snapshot(snap: Dict[str, Any]) -> Dict[str, Any]:
+        """Derive the get_page_info payload from a flattened DOM snapshot."""
+        strings = snap["strings"]
+        doc = snap["documents"][0]
+        nodes = doc["nodes"]
+        attrs = nodes.get("attributes", [])
+
+        def input_type(index: int) -> str:
+            try:
+                pairs = attrs[index]
+            except IndexError:
+                return ""
+            for j in range(0, len(pairs) - 1, 2):
+                if strings[pairs[j]].lower() == "type":
+                    return strings[pairs[j + 1]].lower()
+            return ""
+
+        counts = {k: 0 for k in ("buttons", "links", "inputs", "forms", "images", "tables")}
+        for i, name_idx in enumerate(nodes["nodeName"]):
+            name = strings[name_idx].lower() if name_idx >= 0 else ""
+            if name == "button":
+                counts["buttons"] += 1
+            elif name == "a":
+                counts["links"] += 1
+            elif name in ("input", "textarea", "select"):
+                counts["inputs"] += 1
+                if name == "input" and input_type(i) in ("button", "submit", "reset"):
+                    counts["buttons"] += 1
+            elif name == "form":
+                counts["forms"] += 1
+            elif name == "img":
+                counts["images"] += 1
+            elif name == "table":
+                counts["tables"] += 1
+        title_idx = doc.get("title", -1)
+        url_idx = doc.get("documentURL", -1)
+        return {
+            "title": strings[title_idx] if title_idx >= 0 else "",
+            "url": strings[url_idx] if url_idx >= 0 else "",
+            "elements": counts,
+        }
+
+    def _eval_js(self, script: str):
+        """Evaluate argument-less JS, preferring the raw CDP channel.
+
+        ``Runtime.evaluate`` skips execute_script's wrapping and argument
+        marshalling; the source is wrapped in an IIFE so the same
+        ``return``-style snippets work on both paths. Scripts that take
+        arguments still go through ``execute_script``.
+        """
+        if self._cdp_nav:
+            try:
+                res = self.driver.execute_cdp_cmd(
+                    "Runtime.evaluate",
+                    {
+                        "expression": "(function(){" + script + "})()",
+                        "returnByValue": True,
+                    },
+                )["result"]
+                if res.get("subtype") != "error":
+                    return res.get("value")
+            except Exception:
+                pass
+        return self.driver.execute_script(script)
+
+    def _cached_scan(self, key: tuple, compute):
+        """Serve a read-only scan from cache while the DOM is unchanged.
+
+        The fingerprint costs one small round-trip; a hit skips the full
+        scan (and, for the LLM, returns byte-identical output that provider
+        prompt caches can reuse).
+        """
+        try:
+            fingerprint = self._eval_js(_JS_FINGERPRINT)
+        except Exception:
+            return compute()
+        hit = self._dom_cache.get(key)
+        if hit is not None and hit[0] == fingerprint:
+            return hit[1]
+        result = compute()
+        self._dom_cache[key] = (fingerprint, result)
+        return result
+
+    def _act(self, selector: str, action):
+        """Run ``action`` on the resolved element, re-looking it up once if
+        the cached reference went stale (page mutated underneath us)."""
+        try:
+            return action(self._resolve(selector))
+        except StaleElementReferenceException:
+            return action(self._resolve(selector, refresh=True))
 
     # ---------------------------------------------------------------------
     # Tool implementations
     # ---------------------------------------------------------------------
 
+    def prefetch(self, url: str) -> None:
+        """Start loading ``url`` in a background thread.
+
+        Lets callers overlap a known-upcoming page load with LLM planning:
+        when the model eventually calls ``navigate_to_url`` with the same
+        URL, the load is joined instead of reissued. Only call this with
+        URLs that are safe to visit unconditionally (e.g. the login page).
+        """
+        if self._prefetch_thread and self._prefetch_thread.is_alive():
+            return
+        self._prefetch_url = url
+        self._prefetch_thread = threading.Thread(
+            target=self._prefetch_get, args=(url,), daemon=True
+        )
+        self._prefetch_thread.start()
+
+    def _prefetch_get(self, url: str) -> None:
+        try:
+            self._goto(url)
+        except Exception:
+            # A failed speculative load must not poison normal navigation.
+            self._prefetch_url = None
+
+    def _goto(self, url: str) -> None:
+        """Load ``url`` and return once the document is interactive.
+
+        ``driver.get`` under the eager page-load strategy already comes back
+        at DOMContentLoaded instead of full load, and — unlike polling
+        ``document.readyState`` after a raw ``Page.navigate`` — it cannot
+        return early against the *previous* document, which still reports
+        "complete" until the new navigation commits.
+        """
+        self.driver.get(url)
+
     def navigate_to_url(self, url: str) -> str:
         """Navigate the browser to ``url``."""
-        self.driver.get(url)
-        return f"Navigated to {url}"
+        self._invalidate_elements()
+        if url == self._prefetch_url:
+            thread = self._prefetch_thread
+            self._prefetch_url = None
+            self._prefetch_thread = None
+            if thread is not None:
+                thread.join()
+            return f"ok|nav|{url}|prefetched"
+        self._goto(url)
+        return f"ok|nav|{url}"
 
     def click_element(self, selector: str) -> str:
         """Click the first element matching the given CSS ``selector``."""
-        element = self.driver.find_element(By.CSS_SELECTOR, selector)
-        element.click()
-        return f"Clicked element with selector: {selector}"
+        self._act(selector, lambda el: el.click())
+        return f"ok|click|{selector}"
+
+    def input_text(
+        self,
+        selector: str,
+        text: str,
+        use_send_keys: bool = False,
+    ) -> str:
+        """Type ``text`` into the element located by CSS ``selector``.
+
+        The default path sets the value in-page via the native setter plus
+        input/change events — one round-trip instead of clear + a send_keys
+        exchange per key. Pass ``use_send_keys=True`` for widgets that react
+        to individual keystrokes (autocompletes, masked inputs).
+        """
+        if not use_send_keys:
+            return self.driver.execute_script(_JS_SET_VALUE, selector, text)
+
+        def _type(el):
+            el.clear()
+            el.send_keys(text)
+
+        self._act(selector, _type)
+        return f"ok|input|{selector}"
 
-    def input_text(self, selector: str, text: str) -> str:
-        """Type ``text`` into the element located by CSS ``selector``."""
-        element = self.driver.find_element(By.CSS_SELECTOR, selector)
-        element.clear()
-        element.send_keys(text)
-        return f"Entered text '{text}' into field with selector: {selector}"
+    def get_page_content(self, offset: int = 0) -> str:
+        """Return visible text from the current page, one 4 KB chunk at a time.
 
-    def get_page_content(self) -> str:
-        """Return all visible text from the current page."""
-        return self.driver.find_element(By.TAG_NAME, "body").text
+        ERP pages can dump tens of KB of text; everything returned here is
+        re-sent to the LLM on every later turn, so the payload is capped and
+        the model pages through with ``offset`` when it needs more.
+
+        The text comes from ``document.body.innerText`` in one round-trip
+        (CDP on Chromium, execute_script elsewhere) — Selenium's element
+        ``.text`` walks every descendant with per-node style computation.
+        """
+        # Cache the full text once; paging through offsets then costs only
+        # the fingerprint check per chunk.
+        text = self._cached_scan(("body_text",), lambda: self._eval_js(_JS_BODY_TEXT))
+        chunk = text[offset : offset + self.PAGE_CONTENT_CHUNK]
+        remaining = len(text) - (offset + len(chunk))
+        if remaining > 0:
+            chunk += (
+                f"\n...[{remaining} more chars,"
+                f" call get_page_content(offset={offset + len(chunk)})]"
+            )
+        return chunk
 
     def scroll(self, pixels: int = 1000) -> str:
         """Scroll vertically by ``pixels`` (positive => down, negative => up)."""
-        self.driver.execute_script("window.scrollBy(0, arguments[0]);", pixels)
-        return f"Scrolled page by {pixels} pixels"
+        self.driver.execute_script(_JS_SCROLL_BY, pixels)
+        return f"ok|scroll|{pixels}px"
 
     def press_key(self, selector: str, key: str) -> str:
         """Send a keyboard ``key`` (e.g. ENTER, TAB) to the element at ``selector``."""
-        key_map = {
-            "ENTER": Keys.ENTER,
-            "TAB": Keys.TAB,
-            "ESC": Keys.ESCAPE,
-            "ESCAPE": Keys.ESCAPE,
-            "SPACE": Keys.SPACE,
-            "BACKSPACE": Keys.BACKSPACE,
-        }
-        if key.upper() not in key_map:
-            return f"Unsupported key '{key}'. Supported keys: {', '.join(key_map)}"
-        element = self.driver.find_element(By.CSS_SELECTOR, selector)
-        element.send_keys(key_map[key.upper()])
-        return f"Pressed {key.upper()} on element with selector: {selector}"
+        k = key.upper()
+        mapped = self._KEY_MAP.get(k)
+        if mapped is None:
+            return f"err|key|unsupported {key}; supported: {self._KEY_LIST}"
+        self._act(selector, lambda el: el.send_keys(mapped))
+        return f"ok|key|{k}|{selector}"
 
-    def wait_for_element(self, selector: str, timeout: int = 10) -> str:
-        """Block execution until an element matching ``selector`` is present."""
-        WebDriverWait(self.driver, timeout).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, selector))
+    def batch_actions(self, actions: List[Dict[str, Any]]) -> str:
+        """Execute several element operations in one browser round-trip.
+
+        Each action is a dict ``{"selector": <css>, "op": "click" | "input" |
+        "text" | "key", "arg": <text or key, when needed>}``. The whole list
+        is dispatched by a single ``execute_script`` call, so a K-step flow
+        costs one WebDriver HTTP hop instead of K.
+        """
+        results = self.driver.execute_script(_JS_BATCH, actions)
+        return json.dumps(results, separators=(",", ":"))
+
+    def batch_read(self, calls: List[Dict[str, Any]]) -> str:
+        """Run several read-only lookups concurrently and return all results.
+
+        Each call is a dict ``{"tool": <name>, "args": {...}}`` naming one of
+        the read-only scanners; the batch is fanned out on a small thread
+        pool so overall latency approaches the slowest call rather than the
+        sum. Mutating tools are rejected — their order matters.
+        """
+        def run(call: Dict[str, Any]) -> str:
+            name = call.get("tool", "")
+            if name not in self._READ_ONLY_METHODS:
+                return f"err|batch_read|{name}|not a read-only tool"
+            try:
+                return getattr(self, name)(**call.get("args", {}))
+            except Exception as e:
+                return f"err|batch_read|{name}|{e}"
+
+        with ThreadPoolExecutor(max_workers=min(4, max(len(calls), 1))) as pool:
+            results = list(pool.map(run, calls))
+        return json.dumps(results, separators=(",", ":"), ensure_ascii=False)
+
+    def wait_and_act(
+        self, selector: str, op: str, arg: Optional[str] = None, timeout: int = 10
+    ) -> str:
+        """Wait for ``selector`` to appear and immediately run ``op`` on it.
+
+        Wait and action both happen inside one ``execute_async_script``: a
+        MutationObserver fires the action the instant the element matches,
+        so there is no HTTP polling and no second round-trip for the action.
+        Supported ops: ``click``, ``input`` (arg = text), ``text``.
+        """
+        self.driver.set_script_timeout(timeout + 1)
+        return self.driver.execute_async_script(
+            _JS_WAIT_AND_ACT, selector, op, arg, timeout * 1000
         )
-        return f"Element with selector '{selector}' appeared within {timeout} s"
+
+    def wait_for_element(self, selector: str, timeout: int = 10) -> str:
+        """Block execution until an element matching ``selector`` is present.
+
+        One execute_async_script with a MutationObserver resolves the moment
+        the selector matches — a single HTTP round-trip versus one per
+        500 ms WebDriverWait poll, and no up-to-500 ms tail latency.
+        """
+        self.driver.set_script_timeout(timeout + 1)
+        found = self.driver.execute_async_script(_JS_WAIT_FOR, selector, timeout * 1000)
+        if not found:
+            raise TimeoutException(f"Element '{selector}' did not appear within {timeout} s")
+        return f"ok|wait|{selector}"
 
     def get_element_text(self, selector: str) -> str:
-        """Return the text content of the element specified by ``selector``."""
-        element = self.driver.find_element(By.CSS_SELECTOR, selector)
-        return element.text
+        """Return the text content of the element specified by ``selector``.
+
+        Reads ``innerText`` in one ``execute_script`` hop; WebElement
+        ``.text`` needs a find_element round-trip first and computes style
+        per descendant node on the server side.
+        """
+        text = self.driver.execute_script(_JS_ELEMENT_TEXT, selector)
+        if text is not None:
+            return text
+        # Missed in-page (e.g. inside a frame selenium can reach); fall
+        # back to element resolution, which raises if truly absent.
+        return self._act(selector, lambda el: el.text)
 
-    def take_screenshot(self) -> bytes:
-        """Capture a PNG screenshot of the current page and return it as bytes."""
-        screenshot_bytes = self.driver.get_screenshot_as_png()
-        return screenshot_bytes
+    def get_texts(self, selectors: List[str]) -> str:
+        """Read the inner text of several elements in one browser round-trip.
+
+        N separate get_element_text calls cost N WebDriver HTTP hops; this
+        maps the whole selector list inside the page and returns the texts
+        (or per-selector err| markers) in matching order.
+        """
+        results = self.driver.execute_script(_JS_GET_TEXTS, selectors)
+        return json.dumps(results, separators=(",", ":"), ensure_ascii=False)
+
+    def click_all(self, selectors: List[str]) -> str:
+        """Click several elements in order within one browser round-trip.
+
+        Only for clicks that do not navigate between one another (e.g.
+        expanding multiple collapsed sections); a navigation invalidates the
+        selectors that follow it.
+        """
+        results = self.driver.execute_script(_JS_CLICK_ALL, selectors)
+        return json.dumps(results, separators=(",", ":"))
+
+    def take_screenshot(
+        self,
+        file_path: Optional[str] = None,
+        as_bytes: bool = True,
+        fmt: str = "webp",
+        quality: int = 60,
+        optimize_for_speed: bool = True,
+    ):
+        """Capture a screenshot of the current page.
+
+        Capture goes through CDP ``Page.captureScreenshot`` (skipping
+        Selenium's extra wrapping layers) with a fallback to
+        ``get_screenshot_as_png``. The default lossy webp at quality 60 is
+        ~5-10x smaller than the PNG a 1080p page produces — less data over
+        the WebDriver socket, and far fewer tokens if the image is later
+        base64-embedded into an LLM request. Pass ``fmt="png"`` for
+        lossless. When ``file_path`` is given the disk write is handed to a
+        background thread so the call returns without blocking on I/O; with
+        ``as_bytes`` (the default) the raw bytes are returned.
+        """
+        try:
+            params: Dict[str, Any] = {
+                "format": fmt,
+                "captureBeyondViewport": False,
+                # Favour encode speed over a few percent of size; the image
+                # is consumed once, not archived.
+                "optimizeForSpeed": optimize_for_speed,
+            }
+            if fmt != "png":
+                params["quality"] = quality
+            data = self.driver.execute_cdp_cmd("Page.captureScreenshot", params)["data"]
+            raw = base64.b64decode(data)
+        except Exception:
+            raw = self.driver.get_screenshot_as_png()
+        if file_path:
+            self._write_async(file_path, raw)
+            if not as_bytes:
+                return f"ok|screenshot|{file_path}|queued"
+        return raw
+
+    @staticmethod
+    def _write_file(path: str, data: bytes) -> None:
+        with open(path, "wb") as fh:
+            fh.write(data)
+
+    def _write_async(self, path: str, data: bytes) -> None:
+        """Queue a file write on the shared I/O pool and track it so bursts
+        of captures can be awaited in one place rather than per call."""
+        self._pending_writes = [f for f in self._pending_writes if not f.done()]
+        self._pending_writes.append(self._io_pool.submit(self._write_file, path, data))
+
+    def flush_writes(self) -> str:
+        """Block until every queued background file write has completed."""
+        for future in self._pending_writes:
+            future.result()
+        self._pending_writes.clear()
+        return "ok|flush_writes"
+
+    def _tab_handles(self, refresh: bool = False) -> List[str]:
+        """Return the cached handle list, refetching only when asked or empty."""
+        if refresh or not self._handles:
+            self._handles = list(self.driver.window_handles)
+        return self._handles
 
     def open_new_tab(self, url: Optional[str] = None) -> str:
         """Open a new browser tab and optionally navigate to ``url``."""
-        self.driver.execute_script("window.open('');")
-        self.driver.switch_to.window(self.driver.window_handles[-1])
+        self._invalidate_elements()
+        self.driver.execute_script(_JS_OPEN_TAB)
+        # One refresh to learn the new handle id; later switches stay local.
+        handles = self._tab_handles(refresh=True)
+        self.driver.switch_to.window(handles[-1])
         if url:
-            self.driver.get(url)
-            return f"Opened new tab and navigated to {url}"
-        return "Opened new blank tab"
+            self._goto(url)
+            return f"ok|new_tab|{url}"
+        return "ok|new_tab"
 
     def switch_tab(self, index: int = 0) -> str:
         """Switch to the tab at ``index`` (0-based)."""
-        handles = self.driver.window_handles
+        self._invalidate_elements()
+        handles = self._tab_handles()
+        if index < 0 or index >= len(handles):
+            # The cache may be stale (e.g. a page opened its own popup);
+            # reconcile with the driver before giving up.
+            handles = self._tab_handles(refresh=True)
         if index < 0 or index >= len(handles):
             raise IndexError(
                 f"Tab index {index} out of range. {len(handles)} tab(s) open."
             )
-        self.driver.switch_to.window(handles[index])
-        return f"Switched to tab {index}"
+        try:
+            self.driver.switch_to.window(handles[index])
+        except Exception:
+            handles = self._tab_handles(refresh=True)
+            self.driver.switch_to.window(handles[index])
+        return f"ok|switch_tab|{index}"
 
     def close_current_tab(self) -> str:
         """Close the active tab and switch to the last remaining handle."""
+        self._invalidate_elements()
+        try:
+            self._handles.remove(self.driver.current_window_handle)
+        except ValueError:
+            self._handles = []
         self.driver.close()
-        if self.driver.window_handles:
-            self.driver.switch_to.window(self.driver.window_handles[-1])
-        return "Closed current tab"
+        if self._tab_handles():
+            self.driver.switch_to.window(self._handles[-1])
+        return "ok|close_tab"
 
     def close_browser(self) -> str:
         """Terminate the browser session entirely."""
+        self.flush_writes()
+        self._io_pool.shutdown(wait=True)
         self.driver.quit()
-        return "Browser closed"
+        return "ok|close_browser"
 
     def check_element_exists(self, selector: str) -> str:
         """Check if an element matching the CSS selector exists on the current page.
-        
+
         Returns a JSON string with existence status and additional information.
+        All fields come back from one ``execute_script`` — the previous
+        version made five sequential WebDriver requests per element, plus
+        the implicit-wait penalty whenever the element was absent.
         """
-        try:
-            element = self.driver.find_element(By.CSS_SELECTOR, selector)
-            is_visible = element.is_displayed()
-            is_enabled = element.is_enabled()
-            tag_name = element.tag_name
-            element_type = element.get_attribute("type") or "unknown"
-            
-            result = {
-                "exists": True,
-                "visible": is_visible,
-                "enabled": is_enabled,
-                "tag_name": tag_name,
-                "type": element_type,
-                "text": element.text[:100] if element.text else "",  # First 100 chars
-                "message": f"Element '{selector}' found and is {'visible' if is_visible else 'hidden'}"
-            }
-            return json.dumps(result, indent=2)
-        except NoSuchElementException:
+        info = self.driver.execute_script(_JS_ELEMENT_INFO, selector)
+        if info is None:
             result = {
                 "exists": False,
                 "visible": False,
                 "enabled": False,
                 "message": f"Element '{selector}' not found on the page"
             }
-            return json.dumps(result, indent=2)
+        else:
+            result = {"exists": True, **info}
+            result["message"] = (
+                f"Element '{selector}' found and is "
+                f"{'visible' if info['visible'] else 'hidden'}"
+            )
+        return json.dumps(result, separators=(",", ":"), ensure_ascii=False)
 
     def find_elements_by_text(self, text: str, partial_match: bool = True) -> str:
         """Find all elements containing the specified text.
@@ -176,281 +1090,237 @@ class BrowserTools:
             text: Text to search for
             partial_match: If True, search for partial matches; if False, exact matches only
         """
-        try:
-            if partial_match:
-                elements = self.driver.find_elements(By.XPATH, f"//*[contains(text(), '{text}')]")
-            else:
-                elements = self.driver.find_elements(By.XPATH, f"//*[text()='{text}']")
-            
-            results = []
-            for i, element in enumerate(elements[:10]):  # Limit to first 10 results
-                try:
-                    results.append({
-                        "index": i,
-                        "tag_name": element.tag_name,
-                        "text": element.text[:100],
-                        "selector": self._generate_selector(element),
-                        "visible": element.is_displayed(),
-                        "enabled": element.is_enabled()
-                    })
-                except:
-                    continue
-            
-            return json.dumps({
-                "count": len(elements),
-                "results": results,
-                "message": f"Found {len(elements)} elements containing '{text}'"
-            }, indent=2)
-        except Exception as e:
-            return json.dumps({
-                "count": 0,
-                "results": [],
-                "message": f"Error searching for text '{text}': {str(e)}"
-            }, indent=2)
+        def compute() -> str:
+            try:
+                found = self.driver.execute_script(
+                    _JS_FIND_BY_TEXT, text, partial_match, 10
+                )
+                return json.dumps({
+                    "count": found["count"],
+                    "results": found["results"],
+                    "message": f"Found {found['count']} elements containing '{text}'"
+                }, separators=(",", ":"), ensure_ascii=False)
+            except Exception as e:
+                return json.dumps({
+                    "count": 0,
+                    "results": [],
+                    "message": f"Error searching for text '{text}': {str(e)}"
+                }, separators=(",", ":"))
+
+        # Models often re-issue the same search while deciding what to click;
+        # identical queries on an unchanged DOM come straight from cache.
+        return self._cached_scan(("find_text", text, partial_match), compute)
 
     def get_page_info(self) -> str:
-        """Get comprehensive information about the current page including title, URL, and available elements."""
-        try:
-            page_info = {
-                "title": self.driver.title,
-                "url": self.driver.current_url,
-                "elements": {}
-            }
-            
-            # Count common element types
-            common_selectors = {
-                "buttons": "button, input[type='button'], input[type='submit'], input[type='reset']",
-                "links": "a",
-                "inputs": "input, textarea, select",
-                "forms": "form",
-                "images": "img",
-                "tables": "table"
-            }
-            
-            for element_type, selector in common_selectors.items():
-                try:
-                    elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                    page_info["elements"][element_type] = len(elements)
-                except:
-                    page_info["elements"][element_type] = 0
-            
-            return json.dumps(page_info, indent=2)
-        except Exception as e:
-            return json.dumps({
-                "error": f"Failed to get page info: {str(e)}"
-            }, indent=2)
+        """Get comprehensive information about the current page including title, URL, and available elements.
+
+        Title, URL and all element counts are collected by one
+        ``execute_script`` call — the old per-type ``find_elements`` loop
+        cost eight WebDriver round-trips and serialized every matched
+        element over the wire just to take a ``len``.
+        """
+        def compute() -> str:
+            try:
+                # Prefer counting over the shared DOM snapshot: on a cache
+                # hit the page isn't touched at all, and a miss still costs
+                # one CDP payload reused by every other snapshot consumer.
+                snap = self._snapshot()
+                if snap is not None:
+                    page_info = self._page_info_from_snapshot(snap)
+                else:
+                    page_info = self._eval_js(_JS_PAGE_INFO)
+                return json.dumps(page_info, separators=(",", ":"), ensure_ascii=False)
+            except Exception as e:
+                return json.dumps({
+                    "error": f"Failed to get page info: {str(e)}"
+                }, separators=(",", ":"))
+
+        return self._cached_scan(("page_info",), compute)
 
     def safe_click_element(self, selector: str, timeout: int = 5) -> str:
         """Safely click an element with better error handling and waiting.
-        
+
         This method waits for the element to be clickable before attempting to click.
+        Both presence and the click honor ``timeout`` on a tight 0.1 s
+        fluent poll: a late-appearing element is still found, and transient
+        overlay/animation intercepts resolve quickly instead of on the
+        default 0.5 s poll grid.
         """
+        locator = _css_locator(selector)
+        wait = WebDriverWait(self.driver, timeout, poll_frequency=0.1)
         try:
-            # Wait for element to be present and clickable
-            element = WebDriverWait(self.driver, timeout).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, selector))
-            )
-            element.click()
-            return f"Successfully clicked element with selector: {selector}"
+            element = wait.until(lambda driver: driver.find_element(*locator))
         except TimeoutException:
-            return f"Element '{selector}' not clickable within {timeout} seconds"
-        except ElementNotInteractableException:
-            return f"Element '{selector}' is not interactable (may be hidden or disabled)"
-        except NoSuchElementException:
-            return f"Element '{selector}' not found on the page"
+            return f"err|click|{selector}|not found within {timeout}s"
+        try:
+            def attempt(_driver):
+                try:
+                    element.click()
+                    return True
+                except (ElementClickInterceptedException, ElementNotInteractableException):
+                    return False
+
+            wait.until(attempt)
+            return f"ok|click|{selector}"
+        except TimeoutException:
+            return f"err|click|{selector}|not clickable within {timeout}s"
         except Exception as e:
-            return f"Error clicking element '{selector}': {str(e)}"
+            return f"err|click|{selector}|{str(e)}"
 
     def safe_input_text(self, selector: str, text: str, timeout: int = 5) -> str:
-        """Safely input text into an element with better error handling and waiting."""
+        """Safely input text into an element with better error handling and waiting.
+
+        Presence and enablement both honor ``timeout``, polled on the fast
+        0.1 s grid.
+        """
+        locator = _css_locator(selector)
+        wait = WebDriverWait(self.driver, timeout, poll_frequency=0.1)
         try:
-            # Wait for element to be present and interactable
-            element = WebDriverWait(self.driver, timeout).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, selector))
-            )
-            
-            # Check if element is interactable
-            if not element.is_enabled():
-                return f"Element '{selector}' is disabled and cannot receive input"
-            
+            element = wait.until(lambda driver: driver.find_element(*locator))
+        except TimeoutException:
+            return f"err|input|{selector}|not found within {timeout}s"
+        try:
+            wait.until(lambda _driver: element.is_enabled())
             element.clear()
             element.send_keys(text)
-            return f"Successfully entered text '{text}' into element with selector: {selector}"
+            return f"ok|input|{selector}"
         except TimeoutException:
-            return f"Element '{selector}' not found within {timeout} seconds"
+            return f"err|input|{selector}|not enabled within {timeout}s"
         except ElementNotInteractableException:
-            return f"Element '{selector}' is not interactable (may be hidden or disabled)"
-        except NoSuchElementException:
-            return f"Element '{selector}' not found on the page"
+            return f"err|input|{selector}|not interactable"
         except Exception as e:
-            return f"Error entering text into element '{selector}': {str(e)}"
+            return f"err|input|{selector}|{str(e)}"
 
     def get_clickable_elements(self) -> str:
-        """Get a list of all clickable elements on the current page with their selectors."""
-        try:
-            # Find all clickable elements
-            clickable_selectors = [
-                "button",
-                "input[type='button']",
-                "input[type='submit']",
-                "input[type='reset']",
-                "a[href]",
-                "[onclick]",
-                "[role='button']"
-            ]
-            
-            all_clickable = []
-            for selector in clickable_selectors:
-                try:
-                    elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                    for element in elements:
-                        if element.is_displayed() and element.is_enabled():
-                            all_clickable.append({
-                                "tag_name": element.tag_name,
-                                "text": element.text[:50] if element.text else "",
-                                "selector": self._generate_selector(element),
-                                "type": element.get_attribute("type") or "unknown",
-                                "href": element.get_attribute("href") or ""
-                            })
-                except:
-                    continue
-            
-            # Remove duplicates based on selector
-            unique_clickable = []
-            seen_selectors = set()
-            for element in all_clickable:
-                if element["selector"] not in seen_selectors:
-                    unique_clickable.append(element)
-                    seen_selectors.add(element["selector"])
-            
-            return json.dumps({
-                "count": len(unique_clickable),
-                "elements": unique_clickable[:20],  # Limit to first 20
-                "message": f"Found {len(unique_clickable)} clickable elements"
-            }, indent=2)
-        except Exception as e:
-            return json.dumps({
-                "count": 0,
-                "elements": [],
-                "message": f"Error finding clickable elements: {str(e)}"
-            }, indent=2)
+        """Get a list of clickable elements on the current page with their selectors.
+
+        The scan runs entirely in-page (one ``execute_script``): the old
+        version issued a ``find_elements`` per selector family plus two
+        property round-trips per element, which on a dense ERP screen meant
+        hundreds of WebDriver HTTP calls.
+        """
+        def compute() -> str:
+            try:
+                elements = self.driver.execute_script(
+                    _JS_CLICKABLE, self.MAX_CLICKABLE_ELEMENTS
+                )
+                return json.dumps({
+                    "count": len(elements),
+                    "elements": elements,
+                }, separators=(",", ":"), ensure_ascii=False)
+            except Exception as e:
+                return json.dumps({
+                    "count": 0,
+                    "elements": [],
+                    "message": f"Error finding clickable elements: {str(e)}"
+                }, separators=(",", ":"))
+
+        return self._cached_scan(("clickable",), compute)
 
     def get_form_elements(self) -> str:
-        """Get a list of all form input elements on the current page."""
-        try:
-            form_selectors = [
-                "input",
-                "textarea",
-                "select",
-                "button[type='submit']"
-            ]
-            
-            form_elements = []
-            for selector in form_selectors:
-                try:
-                    elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                    for element in elements:
-                        if element.is_displayed():
-                            form_elements.append({
-                                "tag_name": element.tag_name,
-                                "type": element.get_attribute("type") or "unknown",
-                                "name": element.get_attribute("name") or "",
-                                "id": element.get_attribute("id") or "",
-                                "placeholder": element.get_attribute("placeholder") or "",
-                                "value": element.get_attribute("value") or "",
-                                "selector": self._generate_selector(element),
-                                "required": element.get_attribute("required") is not None
-                            })
-                except:
-                    continue
-            
-            return json.dumps({
-                "count": len(form_elements),
-                "elements": form_elements,
-                "message": f"Found {len(form_elements)} form elements"
-            }, indent=2)
-        except Exception as e:
-            return json.dumps({
-                "count": 0,
-                "elements": [],
-                "message": f"Error finding form elements: {str(e)}"
-            }, indent=2)
+        """Get a list of all form input elements on the current page.
+
+        One ``execute_script`` replaces the per-tag ``find_elements`` loop
+        and its seven ``get_attribute`` round-trips per element.
+        """
+        def compute() -> str:
+            try:
+                form_elements = self._eval_js(_JS_FORM_ELEMENTS)
+                return json.dumps({
+                    "count": len(form_elements),
+                    "elements": form_elements,
+                    "message": f"Found {len(form_elements)} form elements"
+                }, separators=(",", ":"), ensure_ascii=False)
+            except Exception as e:
+                return json.dumps({
+                    "count": 0,
+                    "elements": [],
+                    "message": f"Error finding form elements: {str(e)}"
+                }, separators=(",", ":"))
+
+        return self._cached_scan(("forms",), compute)
 
     def wait_for_page_load(self, timeout: int = 10) -> str:
-        """Wait for the page to fully load, including dynamic content."""
+        """Wait for the page to fully load, including dynamic content.
+
+        Returns the moment ``readyState`` is complete and pending jQuery
+        requests have drained, instead of a readyState poll loop followed by
+        an unconditional 2-second sleep: already-loaded pages come back in
+        milliseconds rather than always paying the worst case.
+        """
         try:
-            # Wait for document ready state
-            WebDriverWait(self.driver, timeout).until(
-                lambda driver: driver.execute_script("return document.readyState") == "complete"
-            )
-            
-            # Additional wait for common dynamic content
-            time.sleep(2)
-            
-            return f"Page loaded successfully within {timeout} seconds"
-        except TimeoutException:
-            return f"Page load timeout after {timeout} seconds"
+            self.driver.set_script_timeout(timeout + 1)
+            loaded = self.driver.execute_async_script(_JS_WAIT_LOAD, timeout * 1000)
+            if not loaded:
+                return f"err|page_load|timeout {timeout}s"
+            return "ok|page_load"
         except Exception as e:
-            return f"Error waiting for page load: {str(e)}"
+            return f"err|page_load|{str(e)}"
 
     def refresh_page(self) -> str:
         """Refresh the current page and wait for it to load."""
         try:
+            self._invalidate_elements()
             self.driver.refresh()
             self.wait_for_page_load()
-            return "Page refreshed successfully"
+            return "ok|refresh"
         except Exception as e:
-            return f"Error refreshing page: {str(e)}"
+            return f"err|refresh|{str(e)}"
 
     def go_back(self) -> str:
         """Navigate back to the previous page in browser history."""
         try:
+            self._invalidate_elements()
             self.driver.back()
             self.wait_for_page_load()
-            return "Navigated back successfully"
+            return "ok|back"
         except Exception as e:
-            return f"Error navigating back: {str(e)}"
+            return f"err|back|{str(e)}"
 
     def go_forward(self) -> str:
         """Navigate forward in browser history."""
         try:
+            self._invalidate_elements()
             self.driver.forward()
             self.wait_for_page_load()
-            return "Navigated forward successfully"
+            return "ok|forward"
         except Exception as e:
-            return f"Error navigating forward: {str(e)}"
+            return f"err|forward|{str(e)}"
 
     def _generate_selector(self, element) -> str:
-        """Generate a unique CSS selector for an element."""
+        """Generate a unique CSS selector for an element.
+
+        Computed in-page (preferring the helper installed at startup) in one
+        round-trip; the old Python version cost up to five WebDriver calls
+        per element — attributes, parent lookup and a sibling scan.
+        """
         try:
-            # Try ID first
-            element_id = element.get_attribute("id")
-            if element_id:
-                return f"#{element_id}"
-            
-            # Try class
-            element_class = element.get_attribute("class")
-            if element_class:
-                return f".{element_class.split()[0]}"  # Use first class
-            
-            # Fallback to tag name with position
-            tag_name = element.tag_name
-            parent = element.find_element(By.XPATH, "..")
-            siblings = parent.find_elements(By.TAG_NAME, tag_name)
-            for i, sibling in enumerate(siblings):
-                if sibling == element:
-                    return f"{tag_name}:nth-child({i + 1})"
-            
-            return tag_name
-        except:
-            return element.tag_name
+            return self.driver.execute_script(_JS_ELEMENT_SELECTOR, element)
+        except Exception:
+            try:
+                return element.tag_name
+            except Exception:
+                return "*"
 
     # ------------------------------------------------------------------
     # LangChain integration helpers
     # ------------------------------------------------------------------
 
     def get_tools(self) -> List[StructuredTool]:
-        """Return every browser utility as a LangChain ``Tool`` instance."""
+        """Return every browser utility as a LangChain ``Tool`` instance.
+
+        Each StructuredTool wrapper costs a pydantic signature introspection,
+        so the list is built once and cached on the instance.
+        """
+        if self._tools is None:
+            self._tools = self._build_tools()
+        return self._tools
+
+    def _build_tools(self) -> List[StructuredTool]:
+        # langchain is the other heavyweight import; defer it until tools
+        # are actually requested.
+        from langchain.tools import StructuredTool
+
         return [
             StructuredTool.from_function(
                 self.navigate_to_url,
@@ -470,7 +1340,7 @@ class BrowserTools:
             StructuredTool.from_function(
                 self.get_page_content,
                 name="get_page_content",
-                description="Return all visible text from the current page. Use this to understand what's currently displayed on the page.",
+                description="Return visible text from the current page in 4 KB chunks. Use this to understand what's currently displayed; pass offset to read further into a long page.",
             ),
             StructuredTool.from_function(
                 self.scroll,
@@ -482,6 +1352,21 @@ class BrowserTools:
                 name="press_key",
                 description="Send a keyboard key (e.g. ENTER, TAB, ESC) to the element at selector. Useful for form submission or navigation.",
             ),
+            StructuredTool.from_function(
+                self.batch_actions,
+                name="batch_actions",
+                description="Execute a list of element operations ({selector, op, arg}) in a single browser round-trip. Supported ops: click, input (arg=text), text (read innerText), key (arg=key name). Much faster than issuing the equivalent tool calls one by one.",
+            ),
+            StructuredTool.from_function(
+                self.batch_read,
+                name="batch_read",
+                description="Run several read-only lookups (get_page_content, get_element_text, get_texts, get_page_info, get_clickable_elements, get_form_elements, check_element_exists, find_elements_by_text) concurrently. Pass a list of {tool, args} dicts; results come back in the same order.",
+            ),
+            StructuredTool.from_function(
+                self.wait_and_act,
+                name="wait_and_act",
+                description="Wait for an element to appear and immediately click it, type into it (op='input', arg=text) or read its text (op='text') — all in one round-trip. Prefer this over wait_for_element followed by a separate action.",
+            ),
             StructuredTool.from_function(
                 self.wait_for_element,
                 name="wait_for_element",
@@ -492,10 +1377,25 @@ class BrowserTools:
                 name="get_element_text",
                 description="Extract the inner text of a CSS-selected element. Use this to get specific text content from elements.",
             ),
+            StructuredTool.from_function(
+                self.get_texts,
+                name="get_texts",
+                description="Read the inner text of several CSS-selected elements at once; pass a list of selectors and get a list of texts back in the same order. Much faster than repeated get_element_text calls.",
+            ),
+            StructuredTool.from_function(
+                self.click_all,
+                name="click_all",
+                description="Click several CSS-selected elements in order within one browser round-trip. Use only for clicks that don't navigate away (e.g. expanding sections or ticking checkboxes).",
+            ),
             StructuredTool.from_function(
                 self.take_screenshot,
                 name="take_screenshot",
-                description="Capture a PNG screenshot of the current page and return it as bytes for LLM processing. Use this to see the visual state of the page.",
+                description="Capture a screenshot of the current page and return it as bytes for LLM processing (webp quality 60 by default; fmt can be 'webp', 'jpeg' or 'png' with a quality 0-100 for lossy formats). Use this to see the visual state of the page.",
+            ),
+            StructuredTool.from_function(
+                self.flush_writes,
+                name="flush_writes",
+                description="Wait until all queued background file writes (e.g. screenshots taken with file_path) have hit disk. Call this before reading back a file you asked a tool to save.",
             ),
             StructuredTool.from_function(
                 self.open_new_tab,
@@ -546,7 +1446,7 @@ class BrowserTools:
             StructuredTool.from_function(
                 self.get_clickable_elements,
                 name="get_clickable_elements",
-                description="Get a list of all clickable elements on the current page with their selectors, text, and properties. Returns JSON with up to 20 clickable elements. Use this to discover what can be clicked on the page when you're not sure what elements are available.",
+                description="Get a list of clickable elements on the current page with their selector, text and type. Returns JSON with up to 50 elements. Use this to discover what can be clicked on the page when you're not sure what elements are available.",
             ),
             StructuredTool.from_function(
                 self.get_form_elements,
@@ -576,15 +1476,77 @@ class BrowserTools:
         ]
 
 
+class AsyncBrowserTools:
+    """Async facade over :class:`BrowserTools`.
+
+    Selenium's client is synchronous, so every call here hops to a worker
+    thread via ``asyncio.to_thread``; awaiting callers (e.g. a gather-based
+    tool node) overlap browser waits instead of blocking the event loop.
+    The sync instance is shared — a rewrite onto an async W3C wire client
+    would remove the thread hop but is out of scope while selenium remains
+    the driver layer.
+    """
+
+    def __init__(self, sync_tools: Optional[BrowserTools] = None, **kwargs) -> None:
+        self._sync = sync_tools or BrowserTools(**kwargs)
+        self._async_tools: Optional[List[StructuredTool]] = None
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._sync, name)
+        if not callable(attr):
+            return attr
+        return self._to_coroutine(attr)
+
+    @staticmethod
+    def _to_coroutine(fn):
+        @functools.wraps(fn)
+        async def _run(*args, **kwargs):
+            return await asyncio.to_thread(fn, *args, **kwargs)
+
+        return _run
+
+    def get_async_tools(self) -> List[StructuredTool]:
+        """Return the browser tools with a native coroutine path.
+
+        Each tool keeps the sync function (so schema introspection and
+        ``invoke`` still work) and gains a coroutine that ``ainvoke`` uses
+        without the default run-in-executor detour per call.
+        """
+        if self._async_tools is None:
+            from langchain.tools import StructuredTool
+
+            self._async_tools = [
+                StructuredTool.from_function(
+                    func=tool.func,
+                    coroutine=self._to_coroutine(tool.func),
+                    name=tool.name,
+                    description=tool.description,
+                )
+                for tool in self._sync.get_tools()
+            ]
+        return self._async_tools
+
+
 # Convenience helper — allows direct import without instantiating the class.
 # Example usage:
 #     from tools.browser_tools import get_tools
 #     tools = get_tools()
 
 
+_TOOLS_CACHE: Dict[frozenset, List[StructuredTool]] = {}
+
+
 def get_tools(**kwargs) -> List[StructuredTool]:  # pylint: disable=invalid-name
-    """Module-level wrapper that instantiates :class:`BrowserTools` and returns its tools."""
-    return BrowserTools(**kwargs).get_tools()
+    """Module-level wrapper that instantiates :class:`BrowserTools` and returns its tools.
+
+    Cached per identical kwargs, so repeated agent bootstraps reuse one
+    BrowserTools (and one Chrome) instead of paying startup + pydantic
+    schema generation again.
+    """
+    key = frozenset(kwargs.items())
+    if key not in _TOOLS_CACHE:
+        _TOOLS_CACHE[key] = BrowserTools(**kwargs).get_tools()
+    return _TOOLS_CACHE[key]
 
 
 if __name__ == "__main__":
@@ -1,30 +1,72 @@
 from pathlib import Path
-from this import d
 from langchain_core.runnables.graph import Graph
 import json
 from langgraph.graph.state import CompiledStateGraph
 from langchain_core.runnables.config import RunnableConfig
-from typing import Annotated, TypedDict, Union, Tuple, Dict, Any
-from langgraph.graph.message import add_messages
-from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+from typing import Annotated, TypedDict, Union, Tuple, Dict, Any, Optional
+from functools import lru_cache
+from langchain_openai import ChatOpenAI
+from pydantic import SecretStr
+from langchain_core.messages import (
+    AIMessage,
+    AIMessageChunk,
+    BaseMessage,
+    HumanMessage,
+    ToolMessage,
+)
 from langgraph.constants import END
+from langgraph.errors import GraphBubbleUp
+import asyncio
+import hashlib
 import os
+import shutil
+import sys
 from getpass import getpass
 from dotenv import load_dotenv
 
+try:
+    import orjson
+except ImportError:  # optional C encoder; stdlib json works everywhere
+    orjson = None
 
+
+def _dumps(obj: Any) -> str:
+    """Serialize a tool result to str, preferring orjson's C encoder.
+
+    Tool payloads (element lists, page summaries) sit on the per-step hot
+    path; the stdlib fallback at least skips whitespace and the
+    retry-on-TypeError dance via ``default=str``.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj).decode("utf-8")
+        except TypeError:
+            pass  # non-native types fall through to default=str
+    return json.dumps(obj, separators=(",", ":"), default=str)
+
+
+@lru_cache(maxsize=1)
 def load_llm_env_vars() -> Tuple[str, str, bool]:
     """
     Loads LLM_API_TOKEN and LLM_BASE_URL from .env file or environment variables.
     If not found, prompts the user to enter them securely.
+    Cached so repeated callers don't re-parse .env from disk.
     Returns:
         tuple: (LLM_API_TOKEN, LLM_BASE_URL)
     """
     load_dotenv()
     api_token = os.getenv("LLM_API_TOKEN")
     base_url = os.getenv("LLM_BASE_URL")
-    DEBUG = os.getenv("DEBUG") or False
+    # getenv returns a string, so any value — even "0" or "false" — used to
+    # count as truthy; parse the conventional spellings instead.
+    DEBUG = os.getenv("DEBUG", "").lower() in ("1", "true", "yes")
 
+    if (not api_token or not base_url) and not sys.stdin.isatty():
+        # Prompting in a server/CI process blocks on stdin forever (and
+        # wedges any event loop with it); fail immediately instead.
+        raise RuntimeError(
+            "LLM_API_TOKEN/LLM_BASE_URL not set and no TTY available to prompt"
+        )
     if not api_token:
         api_token = getpass("Enter your LLM_API_TOKEN: ")
         os.environ["LLM_API_TOKEN"] = api_token
@@ -34,8 +76,68 @@ def load_llm_env_vars() -> Tuple[str, str, bool]:
     return api_token, base_url, DEBUG
 
 
+@lru_cache(maxsize=4)
+def get_chat_llm(
+    model: str = "openai/gpt-4.1-nano",
+    temperature: float = 0.0,
+    max_tokens: Optional[int] = 256,
+    streaming: bool = True,
+) -> ChatOpenAI:
+    """
+    Shared ChatOpenAI client, cached per configuration tuple.
+    Every script used to build its own client; reusing one instance also
+    reuses its HTTPX connection pool and tokenizer, and keeps the system
+    prefix byte-identical across scripts for provider-side prompt caching.
+    """
+    api_key, base_url, _ = load_llm_env_vars()
+    return ChatOpenAI(
+        model=model,
+        api_key=SecretStr(api_key),
+        base_url=base_url,
+        default_headers={
+            "HTTP-Referer": "https://your-app.example",
+            "X-Title": "Vacation-robot",
+        },
+        temperature=temperature,
+        max_tokens=max_tokens,
+        streaming=streaming,
+        extra_body={"prompt_cache_key": "leave-bot-sys-v1"},  # prompt-cache hint for OpenAI-compatible providers
+    )
+
+
+def append_messages(left, right):
+    """In-place message reducer: O(new messages) per step, not O(history).
+
+    ``add_messages`` rebuilds (and re-validates) the whole accumulated list
+    on every super-step, which is quadratic in work over a long
+    conversation. This reducer extends ``left`` in place, keeping the one
+    piece of add_messages semantics main.py relies on: an incoming message
+    whose id matches an existing one replaces it rather than appending —
+    the fixed-id system blocks are resent on every turn.
+
+    Tradeoff: checkpoints saved at earlier steps alias the same list
+    object, so time-travel/forked reads can observe later mutations. The
+    bot only ever resumes the head of a single thread, where the aliasing
+    is invisible.
+    """
+    if left is None:
+        return list(right)
+    if not right:
+        return left
+    index = {m.id: i for i, m in enumerate(left) if m.id is not None}
+    for msg in right:
+        i = index.get(msg.id) if msg.id is not None else None
+        if i is None:
+            left.append(msg)
+        else:
+            left[i] = msg
+    return left
+
+
 class State(TypedDict):
-    messages: Annotated[list[Union[BaseMessage, ToolMessage, AIMessage]], add_messages]
+    messages: Annotated[
+        list[Union[BaseMessage, ToolMessage, AIMessage]], append_messages
+    ]
 
 
 def export_graph(
@@ -45,94 +147,384 @@ def export_graph(
 ) -> None:
     """
     Export a graph to a JSON file and a PNG file.
+
+    Rendering the PNG round-trips to the Mermaid server, so renders are
+    content-addressed: the PNG for a given graph topology is kept under
+    ``~/.cache/leave_bot/graphs/<sha1>.png`` and copied on later exports —
+    including across processes and output paths — instead of re-rendered.
     """
-    # 1. Export JSON
-    json_str = json.dumps(g.to_json(), ensure_ascii=False, indent=2)
-    json_path.write_text(json_str, encoding="utf-8")
+    # 1. Export JSON, streamed straight to the file: dumping to a string
+    # and re-encoding via write_text would hold two full copies in memory.
+    obj = g.to_json()
+    with json_path.open("w", encoding="utf-8") as f:
+        json.dump(obj, f, ensure_ascii=False, indent=2)
     print(f"✅  Wrote JSON to {json_path.resolve()}")
 
-    # 2. Render Mermaid PNG bytes
-    png_bytes = g.draw_mermaid_png()
+    # 2. Reuse a previously rendered PNG for this exact topology. The two
+    # encoders produce different bytes, but the key only has to be stable
+    # per machine, and orjson hashes large graphs markedly faster.
+    if orjson is not None:
+        key_bytes = orjson.dumps(obj, option=orjson.OPT_SORT_KEYS)
+    else:
+        key_bytes = json.dumps(obj, sort_keys=True).encode("utf-8")
+
+    # 2a. Sidecar signature next to the output: if the PNG on disk was
+    # rendered from this exact topology, skip even the cache copy.
+    sig = hashlib.blake2b(key_bytes, digest_size=16).hexdigest()
+    sig_path = png_path.with_suffix(".png.sig")
+    try:
+        if png_path.exists() and sig_path.read_text() == sig:
+            print(f"✅  PNG at {png_path.resolve()} already current (graph unchanged)")
+            return
+    except OSError:
+        pass  # missing/unreadable sidecar just means re-verify the long way
+
+    key = hashlib.sha1(key_bytes).hexdigest()
+    cache_dir = Path.home() / ".cache" / "leave_bot" / "graphs"
+    cached_png = cache_dir / f"{key}.png"
+    if cached_png.exists():
+        shutil.copyfile(cached_png, png_path)
+        _write_sig(sig_path, sig)
+        print(f"✅  Copied cached PNG to {png_path.resolve()} (graph unchanged)")
+        return
 
-    # 3. Save PNG
-    png_path.write_bytes(png_bytes)
+    # 3. Render the Mermaid PNG straight to its destination and populate
+    # the cache from the returned bytes.
+    png_bytes = g.draw_mermaid_png(output_file_path=str(png_path))
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        cached_png.write_bytes(png_bytes)
+    except OSError:
+        pass  # an unwritable cache dir only disables reuse
+    _write_sig(sig_path, sig)
     print(f"✅  Wrote PNG to {png_path.resolve()}")
 
 
+def _write_sig(sig_path: Path, sig: str) -> None:
+    """Record the topology signature beside a freshly written PNG."""
+    try:
+        sig_path.write_text(sig)
+    except OSError:
+        pass  # no sidecar only means the fast skip is unavailable next time
+
+
 def stream_until_done(
     graph: CompiledStateGraph, input_ : dict, cfg: RunnableConfig, DEBUG: bool = False
 ):
-    """Stream the graph once and yield every state delta."""
-    for delta in graph.stream(input_, cfg, stream_mode="values"):
-        if DEBUG:
-            print("DEBUG:", delta)
-        yield delta
-
-def pretty_print_messages(event: Dict[str, Any], DEBUG: bool = False) -> None:
-    if "messages" not in event:
+    """Stream the graph once and yield every per-node state delta.
+
+    Runs in "updates" mode and unwraps the {node: delta} envelope, so
+    consumers still receive {"messages": [...]} dicts but only the new
+    messages cross the generator boundary — not the whole history per step.
+    Output is left in the stdout buffer while the turn streams and flushed
+    once at the end, instead of forcing a write per delta.
+    """
+    try:
+        for step in graph.stream(input_, cfg, stream_mode="updates"):
+            for node, delta in step.items():
+                if DEBUG:
+                    print(f"DEBUG [{node}]:", delta)
+                if delta:
+                    yield delta
+    finally:
+        sys.stdout.flush()
+
+async def astream_until_done(
+    graph: CompiledStateGraph,
+    input_: dict,
+    cfg: RunnableConfig,
+    DEBUG: bool = False,
+    prefetch: int = 4,
+):
+    """Async variant of :func:`stream_until_done` with a prefetch queue.
+
+    A producer task keeps pulling deltas from ``graph.astream`` while the
+    consumer is still processing the previous one, so graph execution and
+    printing overlap instead of alternating. ``prefetch`` bounds the queue
+    so a slow consumer applies backpressure rather than buffering a whole
+    run.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=prefetch)
+
+    async def producer() -> None:
+        try:
+            async for step in graph.astream(input_, cfg, stream_mode="updates"):
+                for node, delta in step.items():
+                    if DEBUG:
+                        print(f"DEBUG [{node}]:", delta)
+                    if delta:
+                        await queue.put(delta)
+        finally:
+            await queue.put(None)  # sentinel: producer finished (or failed)
+
+    task = asyncio.create_task(producer())
+    try:
+        while True:
+            delta = await queue.get()
+            if delta is None:
+                break
+            yield delta
+        await task  # surface any producer exception
+    finally:
+        task.cancel()
+        sys.stdout.flush()
+
+
+class ParallelToolNode:
+    """A node that runs the tools requested in the last AIMessage concurrently.
+
+    Browser tools are I/O-bound (network + DOM waits), so independent calls
+    emitted in one AI turn are fanned out with asyncio.gather: wall time is
+    max(latencies) instead of their sum. Calls whose args reference a prior
+    result ("$prev") fall back to sequential execution.
+    """
+
+    def __init__(self, tools: list) -> None:
+        self.tools_by_name = {tool.name: tool for tool in tools}
+
+    def __call__(
+        self, state: State, config: Optional[RunnableConfig] = None
+    ) -> Dict[str, Any]:
+        if messages := state.get("messages", []):
+            message = messages[-1]
+        else:
+            raise ValueError("No message found in input")
+        if not isinstance(message, AIMessage):
+            raise ValueError("The message is not an AIMessage")
+        # Sync entry point so the node works under graph.stream(); under
+        # astream() LangGraph runs it in an executor thread, where a private
+        # event loop is still safe.
+        return asyncio.run(self._arun(message.tool_calls, config))
+
+    async def _arun(
+        self, tool_calls: list, config: Optional[RunnableConfig] = None
+    ) -> Dict[str, Any]:
+        pairs = self._pair_tools(tool_calls)
+        if self._has_dependencies(tool_calls):
+            results = [await self._invoke(tool, tc, config) for tool, tc in pairs]
+        else:
+            results = await asyncio.gather(
+                *(self._invoke(tool, tc, config) for tool, tc in pairs)
+            )
+        return {"messages": list(results)}
+
+    def _pair_tools(self, tool_calls: list) -> list:
+        """Resolve every call's tool up front: one dict lookup per call, and
+        a hallucinated tool name becomes an error message for the model to
+        correct instead of a KeyError that kills the whole turn."""
+        return [(self.tools_by_name.get(tc["name"]), tc) for tc in tool_calls]
+
+    async def _invoke(
+        self, tool, tool_call: dict, config: Optional[RunnableConfig] = None
+    ) -> ToolMessage:
+        if tool is None:
+            return ToolMessage(
+                content=f"err|{tool_call['name']}|unknown tool",
+                name=tool_call["name"],
+                tool_call_id=tool_call["id"],
+            )
+        try:
+            result = await tool.ainvoke(tool_call["args"], config)
+        except GraphBubbleUp:
+            # interrupt()/Command control flow (e.g. a human_assistance
+            # tool) must reach the graph runtime, not become an err result.
+            raise
+        except Exception as e:
+            # A routine failure (stale selector, timeout) must come back as
+            # an error observation the model can correct, not propagate
+            # through gather/astream and kill the whole session.
+            return ToolMessage(
+                content=f"err|{tool_call['name']}|{e}",
+                name=tool_call["name"],
+                tool_call_id=tool_call["id"],
+            )
+        content = result if isinstance(result, str) else _dumps(result)
+        return ToolMessage(
+            content=content,
+            name=tool_call["name"],
+            tool_call_id=tool_call["id"],
+        )
+
+    @staticmethod
+    def _has_dependencies(tool_calls: list) -> bool:
+        """A later call referencing an earlier result must keep its order."""
+        return any("$prev" in str(tc["args"]) for tc in tool_calls)
+
+
+class BasicToolNode(ParallelToolNode):
+    """A node that runs the tools requested in the last AIMessage.
+
+    The original prototype invoked each tool sequentially, so N calls cost
+    sum(latencies). It now shares ParallelToolNode's machinery but always
+    fans out with asyncio.gather — the "basic" node has no dependency
+    convention, so every call in a turn is treated as independent. A
+    semaphore caps in-flight calls so a turn that fans out dozens of them
+    does not exhaust connection pools or trip provider rate limits.
+    """
+
+    def __init__(self, tools: list, max_concurrency: int = 8) -> None:
+        super().__init__(tools)
+        self.max_concurrency = max_concurrency
+
+    async def _arun(
+        self, tool_calls: list, config: Optional[RunnableConfig] = None
+    ) -> Dict[str, Any]:
+        # Created per run: __call__ spins up a fresh event loop each time,
+        # and a Semaphore is bound to the loop it was created under.
+        sem = asyncio.Semaphore(self.max_concurrency)
+        pairs = self._pair_tools(tool_calls)
+        results = await asyncio.gather(
+            *(self._guarded(sem, t, tc, config) for t, tc in pairs)
+        )
+        return {"messages": list(results)}
+
+    async def _guarded(
+        self,
+        sem: asyncio.Semaphore,
+        tool,
+        tool_call: dict,
+        config: Optional[RunnableConfig] = None,
+    ):
+        async with sem:
+            return await self._invoke(tool, tool_call, config)
+
+
+def pretty_print_messages(
+    event: Dict[str, Any], DEBUG: bool = False, fast: bool = True
+) -> None:
+    msgs = event.get("messages")
+    if not msgs:
         return
-    msg = event["messages"][-1]
-    if isinstance(msg, AIMessage) and msg.tool_calls and DEBUG:
+    msg = msgs[-1]
+    if fast and not DEBUG:
+        # pretty_print renders boxed headers and re-wraps the body on every
+        # message; the interactive path only needs the content. Content can
+        # legitimately be a list of blocks — leave those to pretty_print.
+        content = getattr(msg, "content", None)
+        if isinstance(content, str):
+            sys.stdout.write(content + "\n")
+            return
+    # DEBUG first: when it's off (the common case) the short-circuit skips
+    # the isinstance and the tool_calls attribute read entirely.
+    if DEBUG and isinstance(msg, AIMessage) and getattr(msg, "tool_calls", None):
         print("---Tool Call---")
     msg.pretty_print()
-# def stream_graph_updates(
-#     graph: CompiledStateGraph, user_input: str, config: RunnableConfig
-# ) -> CompiledStateGraph:
-#     for event in graph.stream(
-#         {"messages": [{"role": "user", "content": user_input}]}, config=config
-#     ):
-#         for value in event.values():
-#             if value.get("messages", []):
-#                 last_msg = value["messages"][-1]
-#                 if isinstance(last_msg, AIMessage) and last_msg.content:
-#                     print("Assistant:", last_msg.content)
-#     return graph
-
-# class BasicToolNode:
-#     """A node that runs the tools requested in the last AIMessage."""
-
-#     def __init__(self, tools: list) -> None:
-#         self.tools_by_name = {tool.name: tool for tool in tools}
-
-#     def __call__(self, state: State) -> State:
-#         if messages := state.get("messages", []):
-#             message = messages[-1]
-#         else:
-#             raise ValueError("No message found in input")
-#         outputs = []
-#         if isinstance(message, AIMessage):
-#             for tool_call in message.tool_calls:
-#                 tool_result = self.tools_by_name[tool_call["name"]].invoke(
-#                     tool_call["args"]
-#                 )
-#                 outputs.append(
-#                     ToolMessage(
-#                         content=json.dumps(tool_result),
-#                         name=tool_call["name"],
-#                         tool_call_id=tool_call["id"],
-#                     )
-#                 )
-#         else:
-#             raise ValueError("The message is not an AIMessage")
-#         return {"messages": outputs}
-
-
-# def route_tools(
-#     state: State,
-# ):
-#     """
-#     Use in the conditional_edge to route to the ToolNode if the last message
-#     has tool calls. Otherwise, route to the LLM.
-#     """
-#     if messages := state.get("messages", []):
-#         ai_message = messages[-1]
-#     else:
-#         raise ValueError(f"No messages found in input state to tool_edge: {state}")
-#     if (
-#         hasattr(ai_message, "tool_calls")
-#         and isinstance(ai_message, AIMessage)
-#         and len(ai_message.tool_calls) > 0
-#     ):
-#         return "tools"
-#     else:
-#         return END
+
+
+def stream_graph_updates(
+    graph: CompiledStateGraph, user_input: str, config: RunnableConfig
+) -> CompiledStateGraph:
+    """Run one user turn through the graph and print assistant replies.
+
+    Combines two stream modes: "messages" yields LLM tokens as they decode,
+    so the reply appears with first-token latency instead of after the full
+    generation; "updates" carries each node's delta and is used only to
+    terminate the token line ("values" would re-emit the whole accumulated
+    history per step). The input is passed as a ready HumanMessage so
+    LangGraph skips its dict-to-message coercion/validation pass.
+    """
+    payload = {"messages": [HumanMessage(content=user_input)]}
+    streaming_line = False
+    for mode, data in graph.stream(
+        payload, config=config, stream_mode=["updates", "messages"]
+    ):
+        if mode == "messages":
+            token, _meta = data
+            if isinstance(token, AIMessageChunk) and token.content:
+                if not streaming_line:
+                    sys.stdout.write("Assistant: ")
+                    streaming_line = True
+                sys.stdout.write(token.content)
+                sys.stdout.flush()
+        elif streaming_line:
+            # A node finished: end the token line. Content itself is taken
+            # from the token stream, so updates are never printed twice.
+            sys.stdout.write("\n")
+            sys.stdout.flush()
+            streaming_line = False
+    return graph
+
+
+async def astream_graph_updates(
+    graph: CompiledStateGraph, user_input: str, config: RunnableConfig
+) -> CompiledStateGraph:
+    """Async twin of :func:`stream_graph_updates`.
+
+    Streaming via ``graph.astream`` keeps the event loop free while the LLM
+    and tools wait on the network, so several turns or sessions can be
+    interleaved on one loop instead of each blocking a thread. Tokens are
+    printed as they decode, with per-node updates used only to terminate
+    the line — same contract as the sync version.
+    """
+    payload = {"messages": [HumanMessage(content=user_input)]}
+    streaming_line = False
+    async for mode, data in graph.astream(
+        payload, config=config, stream_mode=["updates", "messages"]
+    ):
+        if mode == "messages":
+            token, _meta = data
+            if isinstance(token, AIMessageChunk) and token.content:
+                if not streaming_line:
+                    sys.stdout.write("Assistant: ")
+                    streaming_line = True
+                sys.stdout.write(token.content)
+                sys.stdout.flush()
+        elif streaming_line:
+            sys.stdout.write("\n")
+            sys.stdout.flush()
+            streaming_line = False
+    return graph
+
+# Routing decisions keyed by LangChain message id: conditional-edge fan-in
+# can re-evaluate the same terminal AIMessage within one super-step, and the
+# answer cannot change for a given message. Message ids stay stable when a
+# checkpointer rehydrates fresh objects — unlike id(message), whose
+# recycled addresses would serve stale routes. Cleared wholesale past 1024
+# entries to stay small.
+_route_cache: Dict[str, str] = {}
+
+
+def route_tools(
+    state: State,
+):
+    """
+    Use in the conditional_edge to route to the ToolNode if the last message
+    has tool calls. Otherwise, route to the LLM.
+    """
+    if messages := state.get("messages", []):
+        ai_message = messages[-1]
+    else:
+        raise ValueError(f"No messages found in input state to tool_edge: {state}")
+    key = getattr(ai_message, "id", None)
+    if key is None:
+        return "tools" if getattr(ai_message, "tool_calls", None) else END
+    route = _route_cache.get(key)
+    if route is None:
+        # Hot path — called once per graph step: one duck-typed attribute
+        # read instead of hasattr + isinstance + len; the message reducer
+        # already guarantees message types.
+        route = "tools" if getattr(ai_message, "tool_calls", None) else END
+        if len(_route_cache) > 1024:
+            _route_cache.clear()
+        _route_cache[key] = route
+    return route
+
+
+def make_route_tools(_END=END, _getattr=getattr):
+    """Build a router closure specialized for the conditional edge.
+
+    ``END`` and ``getattr`` are bound as cell/default variables so the
+    returned function resolves them via LOAD_FAST instead of a module
+    dict lookup on every graph step. Pass the result straight to
+    ``graph.add_conditional_edges``; :func:`route_tools` stays around for
+    existing callers.
+    """
+
+    def route(state: State):
+        if messages := state.get("messages", []):
+            ai_message = messages[-1]
+        else:
+            raise ValueError(f"No messages found in input state to tool_edge: {state}")
+        return "tools" if _getattr(ai_message, "tool_calls", None) else _END
+
+    return route